@@ -67,10 +67,14 @@ class DatalogPy(DatalogProto, CriticalResource):
         """
 
         if min_length == 0:
-            self.__log.clear()
+            removed_records, self.__log = self.__log, list()
         else:
+            removed_records = self.__log[:-min_length]
             self.__log = self.__log[-min_length:]
 
+        if removed_records:
+            self.emit(DatalogProto.truncated, removed_records)
+
     def find(
         self, filter_fn: typing.Callable[[typing.Any], bool], reverse: bool = False
     ) -> typing.Optional[typing.Any]:
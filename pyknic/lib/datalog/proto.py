@@ -32,6 +32,7 @@ class DatalogProto(SignalSource):
     """
 
     new_entry = Signal(object)
+    truncated = Signal(list)
 
     @abstractmethod
     def append(self, record: typing.Any) -> None:
@@ -52,7 +53,8 @@ class DatalogProto(SignalSource):
 
     @abstractmethod
     def truncate(self, min_length: int) -> None:
-        """ Remove old records and keep at least N records
+        """ Remove old records and keep at least N records. Removed records are sent (from the oldest one) with
+        the :attr:`.DatalogProto.truncated` signal
 
         :param min_length: number of records in sequence to keep. Not less than this number of records will be kept
         """
@@ -20,16 +20,18 @@
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
+import concurrent.futures
 import functools
 import inspect
 import time
 import typing
 
-from pyknic.lib.tasks.proto import TaskProto
+from pyknic.lib.tasks.proto import TaskProto, TaskResult
 from pyknic.lib.tasks.plain_task import PlainTask
 from pyknic.lib.tasks.thread_executor import ThreadExecutor
 from pyknic.lib.tasks.threaded_task import ThreadedTask
-from pyknic.lib.signals.extra import AsyncWatchDog
+from pyknic.lib.signals.extra import BoundedCallback
+from pyknic.lib.signals.proto import SignalSourceProto, Signal
 from pyknic.lib.verify import verify_value
 from pyknic.lib.io import __default_block_size__, IOGenerator, IOAsyncGenerator, IOProcessor, IOAsyncProcessor
 from pyknic.lib.io import IOProducer
@@ -54,9 +56,19 @@ class AsyncWrapper:
         thread will be created)
         """
         self.__task = task
-        self.__watchdog = AsyncWatchDog(loop, self.__task, TaskProto.task_completed)
+        self.__loop = loop
         self.__executor = thread_executor
 
+        # this future is resolved from a task's thread and is awaited (via the "asyncio.wrap_future") by the loop
+        self.__task_result: concurrent.futures.Future[TaskResult] = concurrent.futures.Future()
+        self.__task_completed_clbk = BoundedCallback(self.__task_completed)
+        self.__task.callback(TaskProto.task_completed, self.__task_completed_clbk)
+
+    def __task_completed(self, source: SignalSourceProto, signal: Signal, value: TaskResult) -> None:
+        """Save a result of a completed task."""
+        if not self.__task_result.done():
+            self.__task_result.set_result(value)
+
     async def __call__(self) -> typing.Any:
         """Execute a task in asynchronous way."""
 
@@ -66,14 +78,14 @@ class AsyncWrapper:
             threaded_task = ThreadedTask(self.__task)
             task_executor = threaded_task.start_async()
 
-        watchdog_future = await self.__watchdog.watchdog_future()
-        await asyncio.gather(task_executor, watchdog_future)
-        watchdog_result = watchdog_future.result()
+        task_result_future = asyncio.wrap_future(self.__task_result, loop=self.__loop)
+        await asyncio.gather(task_executor, task_result_future)
+        task_result = task_result_future.result()
 
-        if watchdog_result.value.exception:
-            raise watchdog_result.value.exception
+        if task_result.exception:
+            raise task_result.exception
 
-        return watchdog_result.value.result
+        return task_result.result
 
     @classmethod
     async def create(
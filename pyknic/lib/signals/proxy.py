@@ -19,10 +19,9 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
-import functools
+import collections
 import threading
 import typing
-import queue
 import weakref
 
 from pyknic.lib.signals.proto import SignalCallbackType, SignalProxyProto, SignalSourceProto, Signal
@@ -40,28 +39,45 @@ class SignalProxy(SignalProxyProto):
 
         :param wrapper_factory: a class is used as a callback wrapper
         """
-        SignalProxyProto.__init__(self)
-        self.__callbacks: weakref.WeakValueDictionary[SignalCallbackType, SignalCallbackType] = \
-            weakref.WeakValueDictionary()
+        # wrappers are grouped by an original callback (its id) so they may be discarded at once. A group is removed
+        # as soon as an original callback is collected (a group finalizer is detached when a group is discarded).
+        # Finalizers refer to this proxy weakly, so a long-lived callback does not keep a proxy alive
+        self.__callbacks: typing.Dict[
+            int, typing.Tuple[typing.List[SignalCallbackType], weakref.finalize[..., typing.Any]]
+        ] = dict()
         self.__wrapper_factory = wrapper_factory if wrapper_factory else CallbackWrapper
 
     def proxy(self, callback: SignalCallbackType) -> SignalCallbackType:
         """ The :meth:`.SignalProxyProto.proxy` method implementation
         """
         callback_wrapper = self.__wrapper_factory.wrapper(callback, weak_callback=True)
-        self.__callbacks[callback_wrapper] = callback
+
+        callback_id = id(callback)
+        group = self.__callbacks.get(callback_id)
+        if group is None:
+            group = ([], weakref.finalize(callback, SignalProxy.__drop_group, weakref.ref(self), callback_id))
+            self.__callbacks[callback_id] = group
+
+        group[0].append(callback_wrapper)
         return callback_wrapper
 
+    @staticmethod
+    def __drop_group(proxy_ref: 'weakref.ref[SignalProxy]', callback_id: int) -> None:
+        """ Remove a group of wrappers when an original callback is collected
+
+        :param proxy_ref: a weak reference to a proxy that holds the group
+        :param callback_id: id of an original callback
+        """
+        proxy = proxy_ref()
+        if proxy is not None:
+            proxy.__callbacks.pop(callback_id, None)
+
     def discard_proxy(self, callback: SignalCallbackType) -> None:
         """ The :meth:`.SignalProxyProto.discard_proxy` method implementation
         """
-        to_remove = []
-        for wrapper, original_callback in self.__callbacks.items():
-            if callback is original_callback:
-                to_remove.append(wrapper)
-
-        for i in to_remove:
-            self.__callbacks.pop(i)
+        group = self.__callbacks.pop(id(callback), None)
+        if group is not None:
+            group[1].detach()
 
 
 class QueueProxyStateError(Exception):
@@ -84,11 +100,15 @@ class QueueProxy(SignalProxy, TaskProto):
         """ This class represent a single callable item in a queue
         """
 
-        def __init__(self, fn: typing.Callable[[], typing.Any]):
+        def __init__(self, fn: typing.Callable[..., typing.Any], args: typing.Tuple[typing.Any, ...] = ()):
             """ Create new item for a queue
+
+            :param fn: a callable to execute
+            :param args: positional arguments with which the callable is called
             """
 
             self.__fn = fn
+            self.__args = args
             self.__wait_event = threading.Event()
             self.__result = None
             self.__raised_exception: typing.Optional[BaseException] = None
@@ -97,7 +117,7 @@ class QueueProxy(SignalProxy, TaskProto):
             """ Execute a callback and check result
             """
             try:
-                self.__result = self.__fn()
+                self.__result = self.__fn(*self.__args)
             except BaseException as e:
                 self.__raised_exception = e
             self.__wait_event.set()
@@ -124,21 +144,32 @@ class QueueProxy(SignalProxy, TaskProto):
             """
             CallbackWrapper.__init__(self, callback, weak_callback=weak_callback)
 
-            self.__queue: typing.Optional[queue.Queue[QueueProxy.Item]] = None
-            self.__stop_event: typing.Optional[threading.Event] = None
+            self.__push_fn: typing.Optional[weakref.WeakMethod[typing.Callable[[QueueProxy.Item], None]]] = None
 
-        def setup_wrapper(
-            self,
-            queue_value: queue.Queue['QueueProxy.Item'],
-            stop_event: threading.Event
-        ) -> None:
+        def setup_wrapper(self, push_fn: typing.Callable[['QueueProxy.Item'], None]) -> None:
             """ Setup this wrapper. Without this setup a wrapper will crash
+
+            :param push_fn: a bound method that appends an item to a queue (or silently discards it if a queue
+            is stopping). This method is referenced weakly, so a wrapper does not keep a queue alive and signals
+            are discarded when a queue is gone
             """
-            assert(not self.__queue)
-            assert(not self.__stop_event)
+            assert(not self.__push_fn)
+            push_ref = weakref.WeakMethod(push_fn)
+            self.__push_fn = push_ref
+
+            item_cls = QueueProxy.Item
 
-            self.__queue = queue_value
-            self.__stop_event = stop_event
+            def pre_hook(
+                callback: SignalCallbackType, source: SignalSourceProto, signal: Signal, value: typing.Any
+            ) -> bool:
+                push_method = push_ref()
+                if push_method is not None:
+                    push_method(item_cls(callback, (source, signal, value)))
+                return False
+
+            # every name that is required for a signal submission is resolved already, so there is no need to
+            # look up attributes per a signal
+            self._pre_hook = pre_hook  # type: ignore[method-assign]  # this is intended
 
         def _pre_hook(
             self, callback: SignalCallbackType, source: SignalSourceProto, signal: Signal, value: typing.Any
@@ -150,15 +181,11 @@ class QueueProxy(SignalProxy, TaskProto):
             :param source: signal origin
             :param signal: emitted signal
             :param value: a value of an emitted signal
-            """
-            assert(self.__queue)
-            assert(self.__stop_event)
 
-            if not self.__stop_event.is_set():
-                self.__queue.put(QueueProxy.Item(functools.partial(
-                    callback, source=source, signal=signal, value=value
-                )))  # type: ignore[call-arg]  # mypy issue with functools.partial
-            return False
+            :note: this method is replaced by the :meth:`.QueueProxy.Wrapper.setup_wrapper` method, so it is called
+            only if a wrapper was not set up
+            """
+            raise QueueProxyStateError('The wrapper has not been set up')
 
     def __init__(self, flash_flush: bool = False) -> None:
         """ Create a new proxy
@@ -169,20 +196,25 @@ class QueueProxy(SignalProxy, TaskProto):
         SignalProxy.__init__(self, wrapper_factory=QueueProxy.Wrapper)
         TaskProto.__init__(self)
 
-        self.__queue: queue.Queue[QueueProxy.Item] = queue.Queue()
+        # producers append items without a lock (the "deque.append" is thread safe) and the only consumer pops
+        # them. The condition is used only to wake up the consumer when it waits for items
+        self.__queue: collections.deque[QueueProxy.Item] = collections.deque()
+        self.__queue_condition = threading.Condition()
+        self.__queue_idle = False  # is True while the queue thread is (or is about to be) waiting for items
+        self.__queue_completed = False
 
         self.__start_once_lock = threading.Lock()
-        self.__stop_once_lock = threading.Lock()
         self.__started_thread: typing.Optional[threading.Thread] = None
         self.__ready_event = threading.Event()
-        self.__stop_event = threading.Event()
+        self.__stopped = False  # is guarded by the "self.__queue_condition"
         self.__flash_flush = flash_flush
 
     def exec(
         self,
-        fn: typing.Callable[[], typing.Any],
+        fn: typing.Callable[..., typing.Any],
         blocking: bool = False,
-        timeout: typing.Union[int, float, None] = None
+        timeout: typing.Union[int, float, None] = None,
+        args: typing.Tuple[typing.Any, ...] = ()
     ) -> typing.Any:
         """ Execute a function inside a queue-thread
 
@@ -190,14 +222,16 @@ class QueueProxy(SignalProxy, TaskProto):
         :param blocking: if True then the function result will be awaited
         :param timeout: timeout with which a result should be awaited. This parameter takes effect only when
         the "blocking" parameter is True
+        :param args: positional arguments with which the "fn" callable is called (so there is no need to wrap
+        a callable with the functools.partial)
         """
-        if self.__started_thread is None or self.__stop_event.is_set():
+        if self.__started_thread is None or self.__stopped:
             raise QueueProxyStateError(
                 'The "exec" method of the QueueProxy class may be called only if the QueueProxy is running'
             )
 
-        queue_item = QueueProxy.Item(fn)
-        self.__queue.put(queue_item)
+        queue_item = QueueProxy.Item(fn, args)
+        self.__push(queue_item)
         if blocking:
             return queue_item.wait(timeout)
 
@@ -209,27 +243,43 @@ class QueueProxy(SignalProxy, TaskProto):
                 self, callback
             )
 
-        callback_wrapper.setup_wrapper(self.__queue, self.__stop_event)
+        callback_wrapper.setup_wrapper(self.__push_signal)
         return callback_wrapper
 
+    def __push_signal(self, item: 'QueueProxy.Item') -> None:
+        """ Append an item that was created by a signal to the queue. Unlike the :meth:`.QueueProxy.exec` method
+        items are discarded silently when the queue is stopping
+
+        :param item: an item to execute
+        """
+        if not self.__stopped:
+            self.__push(item)
+
+    def __push(self, item: 'QueueProxy.Item') -> None:
+        """ Append an item to the queue and wake up the queue thread
+
+        :param item: an item to execute
+        """
+        self.__queue.append(item)
+        # the "idle" flag is set before the queue thread checks the queue for the last time, so either that check
+        # will find this item or the flag is spotted here
+        if self.__queue_idle:
+            with self.__queue_condition:
+                self.__queue_condition.notify()
+
     def __flush(self) -> None:
         """ Execute all the functions that have been stored in the queue
         """
-        try:
-            callback = self.__queue.get(False)
-            while callback:
-                # with the False value
-                if not self.__flash_flush:
-                    callback()
-                self.__queue.task_done()
-                callback = self.__queue.get(False)
-        except queue.Empty:
-            pass
+        while self.__queue:
+            callback = self.__queue.popleft()
+            # with the False value
+            if not self.__flash_flush:
+                callback()
 
     def is_running(self) -> bool:
         """ Return True if this queue is running and may accept items and return False otherwise
         """
-        return self.__started_thread is not None and not self.__stop_event.is_set()
+        return self.__started_thread is not None and not self.__stopped
 
     def wait_initialization(self, timeout: typing.Optional[typing.Union[int, float]] = None) -> None:
         """ The :meth:`.TaskProto.wait_initialization` method implementation
@@ -247,13 +297,25 @@ class QueueProxy(SignalProxy, TaskProto):
 
         self.__ready_event.set()
 
-        while not self.__stop_event.is_set():
-            next_callback = self.__queue.get()
-            next_callback()
-            self.__queue.task_done()
+        queue_value = self.__queue
+
+        while not self.__stopped:
+            # execute every available item without any synchronization
+            while queue_value and not self.__stopped:
+                queue_value.popleft()()
+
+            with self.__queue_condition:
+                self.__queue_idle = True
+                while not queue_value and not self.__stopped:
+                    self.__queue_condition.wait()
+                self.__queue_idle = False
 
         self.__flush()
 
+        with self.__queue_condition:
+            self.__queue_completed = True
+            self.__queue_condition.notify_all()
+
     def stop(self) -> None:
         """ The :meth:`.TaskProto.stop` method implementation
         """
@@ -262,13 +324,17 @@ class QueueProxy(SignalProxy, TaskProto):
             if self.__started_thread is None:
                 raise QueueProxyStateError("QueueProxy hasn't started yet")
 
-        lock_acquire = self.__stop_once_lock.acquire(False)
-        if lock_acquire:
-            self.__stop_event.set()
-            self.__queue.put(QueueProxy.Item(lambda: None))  # force the "self.__queue.get()" to return something
-            self.__queue.join()
-        else:
-            raise QueueProxyStateError("QueueProxy can not br stopped twice")
+        with self.__queue_condition:
+            if self.__stopped:
+                raise QueueProxyStateError("QueueProxy can not br stopped twice")
+
+            self.__stopped = True
+            self.__queue_condition.notify_all()  # wake up the queue thread so it may flush the rest
+
+            # wait for the queue thread to flush the rest. The thread itself is not joined, because
+            # the "start" method may be called by a thread that has something to do after this method
+            while not self.__queue_completed:
+                self.__queue_condition.wait()
 
     def is_inside(self) -> bool:
         """ This method helps to find whether current stack is inside started queue or not
@@ -23,7 +23,7 @@ import threading
 import typing
 
 from abc import ABCMeta
-from weakref import WeakSet
+from weakref import WeakSet, ref
 from inspect import isclass
 
 from pyknic.lib.signals.proto import Signal, SignalSourceProto, UnknownSignalException, SignalCallbackType
@@ -50,7 +50,18 @@ class SignalSourceMeta(ABCMeta):
         """
         ABCMeta.__init__(cls, name, bases, namespace)
 
-        for class_attr in dir(cls):
+        # signals are searched in classes' own namespaces, so signals of plain mixins (which are not created by
+        # this metaclass) are found also. A signal is named after the first class that declares it
+        signal_attrs = set()
+        for mro_class in reversed(cls.__mro__):
+            for class_attr, class_attr_value in vars(mro_class).items():
+                if isinstance(class_attr_value, Signal) is True:
+                    if not class_attr_value.__pyknic_signal_name__:
+                        class_attr_value.__pyknic_signal_name__ = f'{mro_class.__name__}.{class_attr}'
+                    signal_attrs.add(class_attr)
+
+        class_signals = cls.__pyknic_signals__  # type: ignore[attr-defined] # metaclass and mypy issues
+        for class_attr in signal_attrs:
             class_attr_value = ABCMeta.__getattribute__(cls, class_attr)
             if isinstance(class_attr_value, Signal) is True:
                 for base_class in bases:
@@ -62,12 +73,9 @@ class SignalSourceMeta(ABCMeta):
                                 ' (found at the base class %s)'
                                 % (class_attr, str(cls), str(base_class))
                             )
-                        base_class_attr_value.__pyknic_signal_name__ = f'{base_class.__name__}.{class_attr}'
                     except AttributeError:
                         pass
-                if not class_attr_value.__pyknic_signal_name__:
-                    class_attr_value.__pyknic_signal_name__ = f'{cls.__name__}.{class_attr}'
-                cls.__pyknic_signals__.add(class_attr_value)  # type: ignore[attr-defined] # metaclass and mypy issues
+                class_signals.add(class_attr_value)
 
 
 class SignalSource(SignalSourceProto, metaclass=SignalSourceMeta):
@@ -77,38 +85,129 @@ class SignalSource(SignalSourceProto, metaclass=SignalSourceMeta):
     def __init__(self) -> None:
         """ Create new signal source
         """
-        SignalSourceProto.__init__(self)
-
         self.__lock = threading.Lock()
 
-        self.__callbacks: typing.Dict[Signal, WeakSet[SignalCallbackType]] = {
-            x: WeakSet() for x in self.__class__.__pyknic_signals__  # type: ignore[attr-defined] # metaclass and mypy
+        # every signal has two containers: callbacks that are kept by strong references and callbacks that
+        # are kept by weak references. Containers are created with the first callback of a signal
+        self.__callbacks: typing.Dict[
+            Signal, typing.Optional[typing.Tuple[typing.List[SignalCallbackType], WeakSet[SignalCallbackType]]]
+        ] = {
+            x: None for x in self.__class__.__pyknic_signals__  # type: ignore[attr-defined] # metaclass
+        }
+
+        # if a signal has the only callback then here is a weak reference to it. This is a shortcut for the
+        # "emit" method that is used in most cases
+        self.__single_callbacks: typing.Dict[Signal, typing.Optional[ref[SignalCallbackType]]] = {
+            x: None for x in self.__callbacks
         }
 
+    def __update_single_callback(self, signal: Signal) -> None:
+        """ Update a shortcut to the only callback of a signal. Must be called with the "self.__lock" acquired
+
+        :param signal: a signal which callbacks have been changed
+        """
+        strong_callbacks, weak_callbacks = self.__callbacks[signal]  # type: ignore[misc]  # containers exist
+        callbacks = (*strong_callbacks, *weak_callbacks)
+        single_callback = None
+
+        if len(callbacks) == 1:
+            try:
+                single_callback = ref(callbacks[0])
+            except TypeError:
+                pass  # some callables (like builtins) may not be referenced weakly
+
+        self.__single_callbacks[signal] = single_callback
+
     def emit(self, signal: Signal, signal_value: typing.Any = None) -> None:
         """ :meth:`.SignalSourceProto.emit` implementation
         """
         try:
-            with self.__lock:
-                callbacks = self.__callbacks[signal].copy()
+            single_callback = self.__single_callbacks[signal]
         except KeyError:
             raise UnknownSignalException('Unknown signal emitted')
 
+        if single_callback is not None:
+            signal.check_value(signal_value)
+            c = single_callback()
+            if c is not None:
+                c(self, signal, signal_value)
+            return
+
+        signal_callbacks = self.__callbacks[signal]
+        if signal_callbacks is None:
+            signal.check_value(signal_value)
+            return
+
+        with self.__lock:
+            strong_callbacks, weak_callbacks = signal_callbacks
+            callbacks = (*strong_callbacks, *weak_callbacks)
+
         signal.check_value(signal_value)
 
         for c in callbacks:
             if c is not None:
                 c(self, signal, signal_value)
 
-    def callback(self, signal: Signal, callback: SignalCallbackType) -> None:
+    def emit_many(self, signal: Signal, signal_values: typing.Iterable[typing.Any]) -> None:
+        """ Emit the same signal for every value. This is the same as calling the :meth:`.SignalSource.emit`
+        method for each value, but callbacks are looked up once. So callbacks that are added or removed
+        during this call will take effect with the next emission
+
+        :param signal: a signal to send
+        :param signal_values: values to send with a signal (one emission per a value)
+        """
+        try:
+            single_callback = self.__single_callbacks[signal]
+        except KeyError:
+            raise UnknownSignalException('Unknown signal emitted')
+
+        callbacks: typing.Tuple[typing.Optional[SignalCallbackType], ...] = tuple()
+        if single_callback is not None:
+            callbacks = (single_callback(), )
+        else:
+            signal_callbacks = self.__callbacks[signal]
+            if signal_callbacks is not None:
+                with self.__lock:
+                    strong_callbacks, weak_callbacks = signal_callbacks
+                    callbacks = (*strong_callbacks, *weak_callbacks)
+
+        check_value = signal.check_value
+        for signal_value in signal_values:
+            check_value(signal_value)
+            for c in callbacks:
+                if c is not None:
+                    c(self, signal, signal_value)
+
+    def callback(self, signal: Signal, callback: SignalCallbackType, strong: bool = False) -> None:
         """ :meth:`.SignalSourceProto.callback` implementation
+
+        :param strong: whether a callback should be kept by a strong reference. Such callbacks are not discarded
+        by gc, so they must be removed with the :meth:`.SignalSource.remove_callback` method. This may be
+        useful for long-lived callbacks (they are cheaper to call), but it is not suitable for callbacks that
+        are generated by the :class:`.SignalProxyProto` objects (since these objects rely on weak references
+        in order to discard their callbacks)
         """
         try:
-            if hasattr(callback, '__self__') and not isclass(callback.__self__):
+            if not strong and hasattr(callback, '__self__') and not isclass(callback.__self__):
                 raise ValueError('Bounded methods are unsupported')  # since they are discarded by gc
 
             with self.__lock:
-                self.__callbacks[signal].add(callback)
+                signal_callbacks = self.__callbacks[signal]
+                if signal_callbacks is None:
+                    signal_callbacks = ([], WeakSet())
+                    self.__callbacks[signal] = signal_callbacks
+
+                strong_callbacks, weak_callbacks = signal_callbacks
+                if strong:
+                    if callback in weak_callbacks:  # callback may not be referenced weakly
+                        weak_callbacks.remove(callback)
+                    if callback not in strong_callbacks:
+                        strong_callbacks.append(callback)
+                else:
+                    if callback in strong_callbacks:
+                        strong_callbacks.remove(callback)
+                    weak_callbacks.add(callback)
+                self.__update_single_callback(signal)
         except KeyError:
             valid_signals = ', '.join([str(x) for x in self.__callbacks.keys()])
             cls_name = self.__class__.__name__
@@ -120,8 +219,16 @@ class SignalSource(SignalSourceProto, metaclass=SignalSourceMeta):
         """ :meth:`.SignalSourceProto.remove_callback` implementation
         """
         try:
-            callbacks = self.__callbacks[signal]
+            signal_callbacks = self.__callbacks[signal]
+            if signal_callbacks is None:
+                raise KeyError('Signal does not have callbacks')
+
+            strong_callbacks, weak_callbacks = signal_callbacks
             with self.__lock:
-                callbacks.remove(callback)
+                if callback in strong_callbacks:
+                    strong_callbacks.remove(callback)
+                else:
+                    weak_callbacks.remove(callback)
+                self.__update_single_callback(signal)
         except KeyError:
             raise UnknownSignalException('Signal does not have the specified callback')
@@ -29,36 +29,45 @@ class SingletonMeta(ABCMeta):
     """
 
     __instance__ = None  # singleton instance
+    __instance_attrs__: typing.FrozenSet[str] = frozenset()  # names of the instance attributes (cached "dir" result)
 
     def __init__(cls, name: str, bases: typing.Tuple[type], namespace: typing.Dict[str, typing.Any]):
         """ Create a new instance
         """
         ABCMeta.__init__(cls, name, bases, namespace)
+        if cls.__instance__ is not None:
+            ABCMeta.__setattr__(cls, '__instance_attrs__', frozenset(dir(cls.__instance__)))
 
     def __getattribute__(cls, item: str) -> typing.Any:
         """ Try to get attribute from an instance
         """
-        if item == "__instance__":
+        if item == "__instance__" or item == "__instance_attrs__":
             return ABCMeta.__getattribute__(cls, item)
 
-        if cls.__instance__ is not None and item in dir(cls.__instance__):
-            return cls.__instance__.__getattribute__(item)
+        instance = ABCMeta.__getattribute__(cls, "__instance__")
+        if instance is not None and item in ABCMeta.__getattribute__(cls, "__instance_attrs__"):
+            return instance.__getattribute__(item)
 
         return ABCMeta.__getattribute__(cls, item)
 
     def __setattr__(cls, key: str, value: typing.Any) -> None:
         """ Try to set attribute for an instance
         """
-        if cls.__instance__ is not None and key in dir(cls.__instance__):
-            cls.__instance__.__setattr__(key, value)
+        instance = ABCMeta.__getattribute__(cls, "__instance__")
+        if instance is not None and key in ABCMeta.__getattribute__(cls, "__instance_attrs__"):
+            instance.__setattr__(key, value)
         else:
             ABCMeta.__setattr__(cls, key, value)
 
     def setup_singleton(cls, value: typing.Any) -> None:
         """ Setup an instance as a singleton. Each instance may be set up only once
+
+        :note: instance attributes are cached at this moment, so attributes that will be set to the instance later
+        will not be reachable via a class
         """
         if cls.__instance__ is not None:
             raise ValueError('Singleton has been initialized already')
+        ABCMeta.__setattr__(cls, '__instance_attrs__', frozenset(dir(value)))
         cls.__instance__ = value
 
     def singleton(cls) -> typing.Any:
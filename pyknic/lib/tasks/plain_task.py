@@ -21,29 +21,38 @@
 
 import typing
 
-from pyknic.lib.tasks.proto import TaskProto, TaskResult
+from pyknic.lib.tasks.proto import TaskProto, TaskResult, __empty_task_result__
 
 
 class PlainTask(TaskProto):
     """ This class may be treated as an adapter from any callable object to the `.TaskProto` class
     """
 
-    def __init__(self, fn: typing.Callable[[], typing.Any]):
+    def __init__(self, fn: typing.Callable[[], typing.Any], nothrow: bool = False):
         """ Create a new task that executed the specified object
 
         :param fn: object to execute
+        :param nothrow: whether the object is known to raise no exceptions. If it is True, then exceptions are not
+        caught and are not reported with the :attr:`.TaskProto.task_completed` signal (they are propagated from
+        the :meth:`.PlainTask.start` method instead)
         """
         TaskProto.__init__(self)
         self.__function = fn
+        self.__nothrow = nothrow
 
     def start(self) -> None:
         """ The :meth:`.TaskProto.start` method implementation
         """
-        self.emit(self.task_started)
-        try:
-            result = self.__function()
-        except Exception as e:
-            self.emit(self.task_completed, TaskResult(None, exception=e))
-            return
+        emit = self.emit  # signals can not be overridden, so they are taken from the TaskProto class directly
+        emit(TaskProto.task_started)
 
-        self.emit(self.task_completed, TaskResult(result))
+        if self.__nothrow:
+            result = self.__function()
+        else:
+            try:
+                result = self.__function()
+            except Exception as e:
+                emit(TaskProto.task_completed, TaskResult(None, exception=e))
+                return
+
+        emit(TaskProto.task_completed, TaskResult(result) if result is not None else __empty_task_result__)
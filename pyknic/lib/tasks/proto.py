@@ -50,18 +50,23 @@ class NoSuchTaskError(Exception):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TaskResult:
     """ This class is used along with a completion signal defining a result of a completed task. In order to check
     whether a task was completed successfully the 'exception' property should be checked
 
     :note: the 'result' property may be not the same as the result from the original :meth:`TaskProto.start`
     method call
+    :note: results are immutable, so the same object may be shared between completions (see
+    the "__empty_task_result__" object)
     """
     result: typing.Any = None                         # a result of completed record (if any)
     exception: typing.Optional[BaseException] = None  # an exception raised within a task (if any)
 
 
+__empty_task_result__ = TaskResult()  # a result of a task that completed without errors and returned nothing
+
+
 class TaskProto(CapabilitiesAndSignals):
     """ Basic task prototype. Derived classes must implement the only thing - :meth:`TaskProto.start`
     """
@@ -131,6 +136,8 @@ class ScheduleRecordProto(metaclass=ABCMeta):
     (so as simultaneous policy) will be applied to this task and to tasks with the same group id (if it was set).
     """
 
+    __slots__ = ()  # so implementations may omit the "__dict__" attribute
+
     @abstractmethod
     def task(self) -> TaskProto:
         """ Return a task that should be started
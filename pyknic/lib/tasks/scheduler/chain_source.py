@@ -23,13 +23,17 @@
 #  - a chained task should register it's result in a datalog
 #  - there should be a cooldown procedure for tasks that failed to run from the first time
 
+import asyncio
 import enum
 import functools
+import os
+import threading
 import typing
 import uuid
+import weakref
 
-from contextlib import suppress
 from datetime import datetime, timezone
+from inspect import isclass
 
 from pyknic.lib.datalog.proto import DatalogProto
 from pyknic.lib.datalog.datalog import Datalog
@@ -55,24 +59,38 @@ class ChainedTaskState(enum.Enum):
     finalized = enum.auto()  # a task has been cleaned up
 
 
+__utc_timezone__ = timezone.utc
+__finished_task_states__ = frozenset({ChainedTaskState.completed, ChainedTaskState.finalized})
+
+
 class ChainedTaskLogEntry:
     """ This is a record in a log, that describes an event happened to a task
 
     :note: this class was not made with dataclasses because it should be as much "immutable" as possible
     """
 
+    __slots__ = ('__api_id', '__uid', '__event_datetime', '__state', '__result')
+
     def __init__(
         self,
         api_id: str,
         uid: uuid.UUID,
         state: ChainedTaskState,
-        result: typing.Optional[TaskResult] = None
+        result: typing.Optional[TaskResult] = None,
+        event_datetime: typing.Optional[datetime] = None
     ):
         """ Create an entry
+
+        :param api_id: an id of a task
+        :param uid: identifier of a task instance
+        :param state: a new state of a task
+        :param result: a result of a task (if any)
+        :param event_datetime: a time of the event (the current time is used by default). It may be used in order
+        to share the same timestamp between a batch of entries
         """
         self.__api_id = api_id
         self.__uid = uid
-        self.__event_datetime = datetime.now(timezone.utc)
+        self.__event_datetime = event_datetime if event_datetime is not None else datetime.now(__utc_timezone__)
         self.__state = state
         self.__result = result
 
@@ -97,6 +115,103 @@ class ChainedTaskLogEntry:
         return self.__result
 
 
+class ChainedTaskLogIndex:
+    """ This class tracks the latest entries of tasks in a datalog, so tasks states may be found without a log scan.
+    Entries are tracked as they are appended and are dropped as they are truncated. Since a truncation removes
+    the oldest entries, there is no older entry of the same task to restore when an indexed entry is dropped
+    """
+
+    __indexes__: 'weakref.WeakKeyDictionary[DatalogProto, ChainedTaskLogIndex]' = weakref.WeakKeyDictionary()
+    __indexes_lock__ = threading.Lock()
+
+    def __init__(self, datalog: DatalogProto):
+        """ Create an index and subscribe it to the datalog updates
+
+        :param datalog: a log to track
+        """
+        self.__latest_entries: typing.Dict[str, ChainedTaskLogEntry] = dict()
+        self.__finished_entries: typing.Dict[str, ChainedTaskLogEntry] = dict()
+        self.__completed_entries: typing.Dict[str, ChainedTaskLogEntry] = dict()
+
+        datalog.callback(DatalogProto.new_entry, self.__new_entry, strong=True)
+        datalog.callback(DatalogProto.truncated, self.__truncated, strong=True)
+
+        for log_entry in datalog.iterate(reverse=True):
+            self.__index_entry(log_entry, False)  # entries that are received via the callback are newer than the
+            # stored ones
+
+    def __index_entry(self, log_entry: ChainedTaskLogEntry, replace: bool = True) -> None:
+        """ Save an entry to the index
+
+        :param log_entry: an entry to save
+        :param replace: whether the entry is newer than the indexed one
+        """
+        update = dict.__setitem__ if replace else dict.setdefault
+        api_id = log_entry.api_id
+
+        update(self.__latest_entries, api_id, log_entry)
+        if log_entry.state == ChainedTaskState.completed:
+            update(self.__completed_entries, api_id, log_entry)
+            update(self.__finished_entries, api_id, log_entry)
+        elif log_entry.state == ChainedTaskState.finalized:
+            update(self.__finished_entries, api_id, log_entry)
+
+    def __new_entry(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+        self.__index_entry(value)
+
+    def __truncated(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+        indexes = (self.__latest_entries, self.__finished_entries, self.__completed_entries)
+        for log_entry in value:
+            api_id = log_entry.api_id
+            for entries in indexes:
+                if entries.get(api_id) is log_entry:
+                    del entries[api_id]
+
+    def has(self, api_id: str) -> bool:
+        """ Check whether the task has been logged already
+
+        :param api_id: id of a task to check
+        """
+        return api_id in self.__latest_entries
+
+    def latest(self, api_id: str) -> typing.Optional[ChainedTaskLogEntry]:
+        """ Return the latest entry of the specified task
+
+        :param api_id: id of a task to check
+        """
+        return self.__latest_entries.get(api_id)
+
+    def finished(self, api_id: str) -> typing.Optional[ChainedTaskLogEntry]:
+        """ Return the latest entry with the "completed" or the "finalized" state of the specified task
+
+        :param api_id: id of a task to check
+        """
+        return self.__finished_entries.get(api_id)
+
+    def completed(self, api_id: str) -> typing.Optional[ChainedTaskLogEntry]:
+        """ Return the latest entry with the "completed" state of the specified task
+
+        :param api_id: id of a task to check
+        """
+        return self.__completed_entries.get(api_id)
+
+    @classmethod
+    def index(cls, datalog: DatalogProto) -> 'ChainedTaskLogIndex':
+        """ Return an index of the specified datalog (a new index is created on the first request)
+
+        :param datalog: a log which index should be returned
+        """
+        with cls.__indexes_lock__:
+            try:
+                return cls.__indexes__[datalog]
+            except KeyError:
+                pass
+
+            log_index = cls(datalog)
+            cls.__indexes__[datalog] = log_index
+            return log_index
+
+
 # noinspection PyAbstractClass
 class ChainedTask(TaskProto):
     """ This class may be started by a :class:`.ChainedTasksSource` that respects dependencies
@@ -146,6 +261,12 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
     """ This is a source for a scheduler that may start tasks and theirs dependencies
     """
 
+    __response_signals__ = (
+        SchedulerProto.scheduled_task_started,
+        SchedulerProto.scheduled_task_dropped,
+        SchedulerProto.scheduled_task_expired
+    )  # signals that a scheduler emits in response to a scheduled record
+
     def __init__(
         self,
         datalog: typing.Optional[DatalogProto] = None,
@@ -156,8 +277,8 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
         :param datalog: a log where tasks states are stored
         :param registry: a registry that holds classes (the "__default_chained_tasks_registry__" is used by default)
         """
-        ScheduleSourceProto.__init__(self)
-        TaskProto.__init__(self)
+        ScheduleSourceProto.__init__(self)  # the TaskProto.__init__ call is omitted, since both of them initialize
+        # the same SignalSource
 
         self.__queue_proxy = QueueProxy()
 
@@ -169,13 +290,25 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
         self.__scheduler: typing.Optional[SchedulerProto] = None
         self.__record_completed_clbk = BoundedCallback(self.__record_completed)
 
+        # a record is started and awaited one by one (within the queue proxy thread), so a single set of callbacks
+        # is registered for all the records
+        self.__scheduler_response_clbk = BoundedCallback(self.__scheduler_response)
+        self.__pending_record: typing.Optional[ScheduleRecordProto] = None
+        self.__pending_response: typing.Optional[ReceivedSignal] = None
+        self.__response_event = threading.Event()
+
+        self.__log_index = ChainedTaskLogIndex.index(self.__datalog)
+        self.__dependencies_cache: typing.Dict[str, typing.Optional[typing.Set[str]]] = dict()
+
     def __record_completed(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
         if value.source() is self:
-            self.__datalog.append(ChainedTaskLogEntry(
-                value.task().api_id(),
-                value.task().uid(),
-                ChainedTaskState.finalized
-            ))
+            task = value.task()
+            self.__datalog.append(ChainedTaskLogEntry(task.api_id(), task.uid(), ChainedTaskState.finalized))
+
+    def __scheduler_response(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+        if value is self.__pending_record and self.__pending_response is None:
+            self.__pending_response = ReceivedSignal(source, signal, value)
+            self.__response_event.set()
 
     def scheduler_feedback(self, scheduler: 'SchedulerProto', feedback: SchedulerFeedback) -> None:
         """ Register a scheduler by this callback
@@ -186,10 +319,14 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
                 raise ValueError('Unable to subscribe a second scheduler')
             self.__scheduler = scheduler
             self.__scheduler.callback(SchedulerProto.scheduled_task_completed, self.__record_completed_clbk)
+            for response_signal in self.__response_signals__:
+                self.__scheduler.callback(response_signal, self.__scheduler_response_clbk)
         elif feedback == SchedulerFeedback.source_unsubscribed:
             if not self.__scheduler:
                 raise ValueError('Unable to unsubscribe unknown scheduler')
             self.__scheduler.remove_callback(SchedulerProto.scheduled_task_completed, self.__record_completed_clbk)
+            for response_signal in self.__response_signals__:
+                self.__scheduler.remove_callback(response_signal, self.__scheduler_response_clbk)
             self.__scheduler = None
         else:
             raise ValueError('Unknown feedback spotted')
@@ -200,21 +337,25 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
     @classmethod
     def wait_for(cls, datalog: DatalogProto, api_id: str) -> typing.Optional[TaskResult]:
 
-        def result_fn(entry: ChainedTaskLogEntry) -> bool:
-            return entry.api_id == api_id and entry.state == ChainedTaskState.completed
+        def complete_fn(
+            entry: ChainedTaskLogEntry,
+            task_api_id: str = api_id,
+            states: typing.FrozenSet[ChainedTaskState] = __finished_task_states__
+        ) -> bool:
+            # values are bound as defaults in order to be fetched as locals
+            return entry.api_id == task_api_id and entry.state in states
 
-        def complete_fn(entry: ChainedTaskLogEntry) -> bool:
-            return entry.api_id == api_id and entry.state in (ChainedTaskState.completed, ChainedTaskState.finalized)
-
-        result = datalog.find(result_fn, reverse=True)
+        log_index = ChainedTaskLogIndex.index(datalog)
+        result = log_index.completed(api_id)
 
         if result is None:
-            with suppress(StopIteration):
-                with SignalWaiter(datalog, DatalogProto.new_entry, value_matcher=complete_fn):
-                    if datalog.find(complete_fn, reverse=True):
-                        raise StopIteration('Stop to wait')
+            waiter = SignalWaiter(datalog, DatalogProto.new_entry, value_matcher=complete_fn)  # must be subscribed
+            # before the index check, so an entry that is appended in between is not missed
+            if log_index.finished(api_id) is None:
+                waiter.wait()
 
-            result = datalog.find(result_fn, reverse=True)
+            result = log_index.completed(api_id)  # the index is a strong callback, so it is updated before
+            # the waiter
         return result.result if result is not None else None
 
     def __record_group_id(self, api_id: str) -> str:
@@ -222,52 +363,101 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
         """
         return f'{self.__source_uid}--{api_id}'
 
+    def __dependencies(self, api_id: str) -> typing.Optional[typing.Set[str]]:
+        """ Return dependencies of a task with the specified api id. Dependencies are requested from a registry
+        only once
+        """
+        try:
+            return self.__dependencies_cache[api_id]
+        except KeyError:
+            pass
+
+        dependencies = self.__registry.get(api_id).dependencies()
+        self.__dependencies_cache[api_id] = dependencies
+        return dependencies  # type: ignore[no-any-return]
+
+    def clear_cache(self) -> None:
+        """ Forget dependencies that were resolved previously. This method should be called if tasks in a registry
+        have been replaced
+        """
+        self.__dependencies_cache.clear()
+
     def __skip_started(self, api_ids: typing.Set[str]) -> typing.Set[str]:
         """ Filter a list of api id and return only those that is not running at the moment
         """
-        started = set()
+        has_entry = self.__log_index.has
+        return {x for x in api_ids if not has_entry(x)}
+
+    def __required_dependencies(self, api_id: str) -> typing.Set[str]:
+        """ Return dependencies of a task that have not been started yet
+        """
+        dependencies = self.__dependencies(api_id)
+        return self.__skip_started(dependencies) if dependencies else set()
 
-        for log_entry in self.__datalog.iterate():
-            if log_entry.api_id in api_ids:
-                started.add(log_entry.api_id)
+    def __check_started(self, api_ids: typing.Sequence[str]) -> None:
+        """ Raise an exception if any of the specified tasks has been started already
+        """
+        for api_id in api_ids:
+            if self.started_task(api_id) is not None:
+                raise ValueError(f'The task "{api_id}" has been started already')
 
-        return api_ids.difference(started)
+    def __resolve_row(self, api_ids: typing.Sequence[str]) -> typing.List[str]:
+        """ Return ids of tasks to execute in order of execution (dependencies go first). Shared dependencies are
+        returned once. This method does not require the queue thread, so requests are resolved by callers
 
-    def __execution_row(self, api_id: str) -> None:
-        """ Execute a task with api id and it's dependencies
+        :param api_ids: ids of tasks to execute
         """
-        assert(self.__queue_proxy.is_inside())
+        self.__check_started(api_ids)
 
-        if self.started_task(api_id) is not None:
-            raise ValueError(f'The task "{api_id}" has been started already')
+        execution_row: typing.List[str] = []  # dependencies go first
+        processed_ids: typing.Set[str] = set()  # ids that are in the "execution_row" already
+        required_dependencies = self.__required_dependencies
 
-        task_cls = self.__registry.get(api_id)
-        unprocessed_deps = [task_cls.dependencies()]
-        execution_row = [api_id]
+        for api_id in api_ids:
+            if api_id in processed_ids:
+                continue
 
-        while unprocessed_deps:
-            next_deps = set()
+            path_ids = {api_id}  # ids of tasks which dependencies are being resolved
+            unprocessed = [(api_id, iter(required_dependencies(api_id)))]
 
-            for dep in unprocessed_deps:
-                if dep is None:
-                    continue
+            while unprocessed:
+                task_id, task_deps = unprocessed[-1]
 
-                required = self.__skip_started(dep)
+                for dep in task_deps:
+                    if dep in path_ids:
+                        raise ValueError('Mutual dependencies found for a task')
 
-                if required.intersection(execution_row):
-                    raise ValueError('Mutual dependencies found for a task')
+                    if dep not in processed_ids:
+                        path_ids.add(dep)
+                        unprocessed.append((dep, iter(required_dependencies(dep))))
+                        break
+                else:
+                    unprocessed.pop()
+                    path_ids.remove(task_id)
+                    processed_ids.add(task_id)
+                    execution_row.append(task_id)
 
-                next_deps.update(required)
-                for r in required:
-                    execution_row.insert(0, r)
+        return execution_row
 
-            unprocessed_deps = []
-            for d in next_deps:
-                task_cls = self.__registry.get(d)
-                unprocessed_deps.append(task_cls.dependencies())
+    def __execution_row(self, api_ids: typing.Sequence[str], execution_row: typing.List[str]) -> None:
+        """ Execute a previously resolved row of tasks. This is the only entry point for private methods that
+        start tasks, so the queue thread is checked here only
 
-        for i in execution_row:
-            self.__exec(i)
+        :param api_ids: ids of requested tasks
+        :param execution_row: result of the :meth:`.ChainedTasksSource.__resolve_row` method call
+        """
+        assert(self.__queue_proxy.is_inside())
+
+        # tasks may be started by other requests after the row was resolved, so requested tasks are checked again
+        # and dependencies that have been started already are skipped
+        self.__check_started(api_ids)
+        has_entry = self.__log_index.has
+        execution_row = [x for x in execution_row if not has_entry(x)]
+
+        random_bytes = os.urandom(16 * len(execution_row))  # random data for all the uuid4 ids at once
+        exec_fn = self.__exec
+        for n, i in enumerate(execution_row):
+            exec_fn(i, uuid.UUID(bytes=random_bytes[n * 16:(n + 1) * 16], version=4))
 
     def __wait_response(self, record: ScheduleRecordProto) -> typing.Optional[ReceivedSignal]:
         """ Start a record and wait for execution result. Result is a signal that has been received for a started
@@ -278,30 +468,29 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
 
         :param record: a record to start and track
         """
-        assert(self.__queue_proxy.is_inside())
-
         if not self.__scheduler:
             raise ValueError('Scheduler has not registered yet')
 
         assert(record.postpone_policy() == ScheduledTaskPostponePolicy.drop)
 
-        waiter = SignalWaiter(
-            self.__scheduler, SchedulerProto.scheduled_task_started, value_matcher=lambda x: x == record
-        )
-
-        self.__scheduler.callback(SchedulerProto.scheduled_task_dropped, waiter)
-        self.__scheduler.callback(SchedulerProto.scheduled_task_expired, waiter)
+        self.__response_event.clear()
+        self.__pending_response = None
+        self.__pending_record = record
 
-        self.emit(ScheduleSourceProto.task_scheduled, record)
-        return waiter.wait()
+        try:
+            self.emit(ScheduleSourceProto.task_scheduled, record)
+            self.__response_event.wait()
+            return self.__pending_response
+        finally:
+            self.__pending_record = None
 
-    def __exec(self, api_id: str) -> None:
+    def __exec(self, api_id: str, task_uid: uuid.UUID) -> None:
         """ Just execute a task with the specified api id
-        """
-        assert(self.__queue_proxy.is_inside())
 
+        :param api_id: id of a task to execute
+        :param task_uid: identifier of a new task instance
+        """
         task_cls = self.__registry.get(api_id)
-        task_uid = uuid.uuid4()
         record = ScheduleRecord(
             task_cls.create(self.__datalog, api_id, task_uid),
             self,
@@ -319,22 +508,76 @@ class ChainedTasksSource(ScheduleSourceProto, TaskProto):
     def execute(self, api_id: str) -> None:
         """ Request to execute a task (and it's dependencies)
         """
+        self.execute_many((api_id, ))
+
+    def execute_many(self, api_ids: typing.Sequence[str]) -> None:
+        """ Request to execute tasks (and theirs dependencies) within a single request to this source. Dependencies
+        that are shared between tasks are executed once
+
+        :param api_ids: ids of tasks to execute
+        """
+        execution_row = self.__resolve_row(api_ids)
+
+        if self.__queue_proxy.is_inside():
+            self.__execution_row(api_ids, execution_row)  # a blocking request from the queue thread would never
+            # be processed
+            return
+
         try:
-            self.__queue_proxy.exec(functools.partial(self.__execution_row, api_id), blocking=True)
+            self.__queue_proxy.exec(functools.partial(self.__execution_row, api_ids, execution_row), blocking=True)
         except QueueCallbackException as e:
             raise e.__cause__  # type: ignore[misc]  # it's ok
 
+    async def execute_async(self, api_id: str) -> None:
+        """ Request to execute a task (and it's dependencies) without blocking an event loop
+        """
+        await self.execute_many_async((api_id, ))
+
+    async def execute_many_async(self, api_ids: typing.Sequence[str]) -> None:
+        """ The same as the :meth:`.ChainedTasksSource.execute_many` method but a request is awaited without
+        blocking an event loop
+
+        :param api_ids: ids of tasks to execute
+        """
+        execution_row = self.__resolve_row(api_ids)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve_future(exception: typing.Optional[BaseException]) -> None:
+            if future.done():
+                return  # a future may be cancelled already
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(None)
+
+        def execute_row() -> None:
+            exception = None
+            try:
+                self.__execution_row(api_ids, execution_row)
+            except BaseException as e:
+                exception = e
+            loop.call_soon_threadsafe(resolve_future, exception)
+
+        self.__queue_proxy.exec(execute_row)
+        await future
+
     def started_task(self, api_id: str) -> typing.Optional[ChainedTaskLogEntry]:
         """ Return a last log record of the specified task
         """
-        for log_entry in self.__datalog.iterate(reverse=True):
-            if log_entry.api_id == api_id:
-                return log_entry  # type: ignore[no-any-return]
-        return None
+        return self.__log_index.latest(api_id)
 
     def start(self) -> None:
-        """ Start this source
+        """ Start this source. Dependencies of tasks that are registered already are cached at this moment
+        (entries that are not :class:`.ChainedTask` classes are skipped)
         """
+        for api_id in self.__registry.ids():
+            if not isinstance(api_id, str) or api_id in self.__dependencies_cache:
+                continue
+
+            task_cls = self.__registry.get(api_id)
+            if isclass(task_cls) and issubclass(task_cls, ChainedTask):
+                self.__dependencies_cache[api_id] = task_cls.dependencies()
         self.__queue_proxy.start()
 
     def stop(self) -> None:
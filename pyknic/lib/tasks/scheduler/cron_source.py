@@ -21,7 +21,10 @@
 
 import calendar
 import datetime
+import functools
 import heapq
+import itertools
+import re
 import typing
 
 from pyknic.lib.verify import verify_value
@@ -41,6 +44,17 @@ def cron_token_validator(value_min: int, value_max: int) -> typing.Callable[[int
     return validator
 
 
+__cron_tokens_re__ = re.compile(r'\S+')  # tokens of a cron-schedule string are separated by whitespaces
+
+
+@functools.lru_cache(maxsize=4096)
+def _month_range(year: int, month: int) -> typing.Tuple[int, int]:
+    """ Return the same as the calendar.monthrange function does (a weekday of the first day and a number of days in
+    a month), but results are cached since schedules request the same months over and over
+    """
+    return calendar.monthrange(year, month)
+
+
 class CronSchedule:
     """ This class defines cron-a-like schedule
     """
@@ -107,114 +121,93 @@ class CronSchedule:
     def iterate(self, start_datetime: datetime.datetime) -> typing.Generator[datetime.datetime, None, None]:
         """ Return generator that yields datetime at which something should happen
         """
-
-        def is_start_date(y: int, m: int, d: int) -> bool:
-            return y == start_datetime.year and m == start_datetime.month and d == start_datetime.day
-
-        for year, month in self.__month_iterator(start_datetime.year, start_datetime.month):
-
-            current_day = 1
-            if year == start_datetime.year and month == start_datetime.month:
-                current_day = start_datetime.day  # reset day since a new year/month iteration
-
-            for day in self.__day_iterator(year, month, current_day):
-
-                current_hour = 0
-                if is_start_date(year, month, day):
-                    current_hour = start_datetime.hour
-
-                for hour in self.__time_iterator(current_hour, 23, self.hour()):
-                    current_minute = 0
-                    if is_start_date(year, month, day) and hour == start_datetime.hour:
-                        current_minute = start_datetime.minute
-                    for minute in self.__time_iterator(current_minute, 59, self.minute()):
-                        yield datetime.datetime(year, month, day, hour, minute, tzinfo=start_datetime.tzinfo)
-
-    def __month_iterator(
-        self, start_year: int, start_month: int
-    ) -> typing.Generator[typing.Tuple[int, int], None, None]:
-        """ Internal generator that iterates over months
+        tzinfo = start_datetime.tzinfo
+        minute_spec, hour_spec, month_spec = self.__minute, self.__hour, self.__month
+        next_value, next_day = self.__next_value, self.__next_day
+
+        year, month, day = start_datetime.year, start_datetime.month, start_datetime.day
+        hour, minute = start_datetime.hour, start_datetime.minute
+
+        while year <= datetime.MAXYEAR:
+            next_month = next_value(month, 12, month_spec)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            elif next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            matched_day = next_day(year, month, day)
+            if matched_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                continue
+            elif matched_day != day:
+                day, hour, minute = matched_day, 0, 0
+
+            next_hour = next_value(hour, 23, hour_spec)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            elif next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = next_value(minute, 59, minute_spec)
+            while next_minute is not None:
+                yield datetime.datetime(year, month, day, hour, next_minute, tzinfo=tzinfo)
+                next_minute = next_value(next_minute + 1, 59, minute_spec)
+
+            hour, minute = hour + 1, 0
+
+    @verify_value(start_datetime=lambda x: x.tzinfo is not None, end_datetime=lambda x: x.tzinfo is not None)
+    def iterate_window(
+        self, start_datetime: datetime.datetime, end_datetime: datetime.datetime
+    ) -> typing.Generator[datetime.datetime, None, None]:
+        """ Return generator that yields datetime at which something should happen. Unlike the
+        :meth:`.CronSchedule.iterate` method this generator stops before the end_datetime
+
+        :param start_datetime: the first datetime to check (inclusive)
+        :param end_datetime: the end of a window (exclusive)
         """
-        iter_month = self.month()
-
-        if iter_month is not None:
-            if start_month > iter_month:
-                start_year += 1
-            start_month = iter_month
-
-        next_year = start_year
-        next_month = start_month
-
-        while next_year <= datetime.MAXYEAR:
-            yield next_year, next_month
-
-            if iter_month is not None:
-                next_year += 1
-            elif next_month < 12:
-                next_month += 1
-            else:
-                next_year += 1
-                next_month = 1
+        for next_datetime in self.iterate(start_datetime):
+            if next_datetime >= end_datetime:
+                return
+            yield next_datetime
 
-    def __day_iterator(
-        self, start_year: int, start_month: int, start_day: int
-    ) -> typing.Generator[int, None, None]:
-        """ Internal generator that iterates over days
+    @staticmethod
+    def __next_value(value: int, max_value: int, cron_spec: typing.Optional[int]) -> typing.Optional[int]:
+        """ Return the closest value (starting from the specified one) that suits a cron specification or None if
+        there is no such value that is less or equal to the max_value
         """
+        if cron_spec is not None:
+            return cron_spec if value <= cron_spec else None
+        return value if value <= max_value else None
 
-        def weekday(d: int) -> int:
-            return calendar.weekday(start_year, start_month, d) + 1  # weekday returns values between 0 and 6
-
-        def switch_day(d: int, max_days: int, dow: typing.Optional[int]) -> typing.Optional[int]:
-            if dow is None:
-                if d < max_days:
-                    return d + 1
-                return None
-
-            result = d + 7 + dow - weekday(d)
-            if result <= max_days:
-                return result
+    def __next_day(self, year: int, month: int, day: int) -> typing.Optional[int]:
+        """ Return the closest day of a month (starting from the specified one) that suits this schedule or None if
+        there is no such day in the month
+        """
+        first_weekday, days_in_month = _month_range(year, month)  # weekdays are between 0 and 6 here
+        if day > days_in_month:
             return None
 
-        days_in_month = calendar.monthrange(start_year, start_month)[1]
-        iter_day_of_month = self.day_of_month()
-        iter_day_of_week = self.day_of_week()
-
-        if iter_day_of_month is not None:
-            if start_day <= iter_day_of_month <= days_in_month:
-                if iter_day_of_week is None or weekday(iter_day_of_month) == iter_day_of_week:
-                    yield iter_day_of_month
-            return
-
-        next_day = start_day
-        if iter_day_of_week and weekday(next_day) != iter_day_of_week:
-            next_day = switch_day(next_day, days_in_month, iter_day_of_week)  # type: ignore[assignment] # mypy issues
-
-        while next_day is not None:
-            yield next_day
-            next_day = switch_day(next_day, days_in_month, iter_day_of_week)  # type: ignore[assignment] # mypy issues
+        if self.__day_of_month is not None:
+            if not (day <= self.__day_of_month <= days_in_month):
+                return None
+            if self.__day_of_week is not None and \
+                    (first_weekday + self.__day_of_month - 1) % 7 + 1 != self.__day_of_week:
+                return None
+            return self.__day_of_month
 
-    def __time_iterator(
-        self, start_time: int, max_time: int, cron_spec: typing.Optional[int]
-    ) -> typing.Generator[int, None, None]:
-        """ Internal generator that iterates over time
-        """
-        if cron_spec is not None:
-            if start_time <= cron_spec:
-                yield cron_spec
-            return
+        if self.__day_of_week is not None:
+            day += (self.__day_of_week - (first_weekday + day - 1) % 7 - 1) % 7
+            return day if day <= days_in_month else None
 
-        next_time = start_time
-        while next_time <= max_time:
-            yield next_time
-            next_time += 1
+        return day
 
     @classmethod
     def from_string(cls, schedule: str) -> 'CronSchedule':
         """ Parse a string and return a schedule
         """
-        # TODO: replace with regexp
-        return cls.parse_tokens(*tuple(filter(lambda x: len(x) > 0, schedule.strip().split(' '))))
+        return cls.parse_tokens(*__cron_tokens_re__.findall(schedule))
 
     @classmethod
     def parse_tokens(cls, *str_tokens: str) -> 'CronSchedule':
@@ -223,7 +216,7 @@ class CronSchedule:
         if len(str_tokens) != 5:
             raise ValueError('Malformed cron-schedule')
 
-        int_tokens = [int(x) if x != '*' else None for x in str_tokens]
+        int_tokens = tuple(int(x) if x != '*' else None for x in str_tokens)
 
         return cls(
             minute=int_tokens[0],
@@ -255,6 +248,21 @@ class CronScheduleRecord:
         self.__schedule = schedule
         self.__cron_iterator: typing.Optional[typing.Generator[datetime.datetime, None, None]] = None
         self.__next_datetime: typing.Optional[datetime.datetime] = None
+        self.__fast_step = self.__schedule_step(schedule)
+
+    @staticmethod
+    def __schedule_step(schedule: CronSchedule) -> typing.Optional[datetime.timedelta]:
+        """ Return a constant period between schedule datetimes if there is one. It is so for schedules like
+        "every minute", "every hour at MM" and "every day at HH:MM"
+        """
+        if schedule.day_of_month() is not None or schedule.day_of_week() is not None or schedule.month() is not None:
+            return None
+
+        if schedule.minute() is None:
+            return datetime.timedelta(minutes=1) if schedule.hour() is None else None
+        if schedule.hour() is None:
+            return datetime.timedelta(hours=1)
+        return datetime.timedelta(days=1)
 
     def __init_test(self, is_none: bool) -> None:
         """ Check initialization status
@@ -290,6 +298,10 @@ class CronScheduleRecord:
         """ Switch next execution datetime. After this method call the :meth:`.CronScheduleRecord.next` method
         will change value
         """
+        if self.__fast_step is not None:
+            self.__next_datetime = self.next() + self.__fast_step  # the "next" method checks initialization
+            return self.__next_datetime
+
         self.__init_test(False)
         self.__next_datetime = next(self.__cron_iterator)  # type: ignore[arg-type]  # mypy issue
         return self.__next_datetime
@@ -320,49 +332,116 @@ class CronTaskSource(ScheduleSourceProto):
         """
         ScheduleSourceProto.__init__(self)
 
-        self.__records: typing.List[CronScheduleRecord] = []
-        heapq.heapify(self.__records)
+        # heap entries are lists like [next_timestamp, sequence_number, record] (where the next_timestamp is a POSIX
+        # timestamp of the next record datetime), so heap operations compare floats and records with the same
+        # datetime are kept in order of submission. A discarded record is
+        # replaced with None in its entry and such entry is dropped when it reaches the heap top
+        self.__records: typing.List[typing.List[typing.Any]] = []
+        self.__entries: typing.Dict[CronScheduleRecord, typing.List[typing.Any]] = {}
+        self.__sequence = itertools.count()
 
     def __now(self) -> datetime.datetime:
         """ Return datetime object that will be treated as "now" (as it is in UTC timezone)
         """
         return datetime.datetime.now(datetime.timezone.utc)
 
+    def __entry(self, record: CronScheduleRecord) -> typing.List[typing.Any]:
+        """ Create a heap entry for a record with the record's next datetime (the entry is not saved)
+        """
+        return [record.next().timestamp(), next(self.__sequence), record]
+
+    def __push(self, record: CronScheduleRecord) -> None:
+        """ Save a record to the heap with the record's next datetime
+        """
+        entry = self.__entry(record)
+        heapq.heappush(self.__records, entry)
+        self.__entries[record] = entry
+
+    def __head(self) -> typing.Optional[CronScheduleRecord]:
+        """ Return a record with the closest next datetime (discarded records are dropped from the heap top)
+        """
+        while self.__records:
+            record = self.__records[0][2]
+            if record is not None:
+                return record  # type: ignore[no-any-return]
+            heapq.heappop(self.__records)
+        return None
+
     def submit_record(self, record: CronScheduleRecord) -> None:
         """ Append a record to this source
         """
+        self.submit_records((record, ))
 
-        # if new record updates last poll timeout a signal polling_update will be sent
+    def submit_records(self, records: typing.Iterable[CronScheduleRecord]) -> None:
+        """ Append records to this source. The :attr:`.CronTaskSource.polling_update` signal is emitted once at most
+
+        :param records: records to append
+        """
+
+        # if new records update last poll timeout a signal polling_update will be sent
         now = self.__now()
-        record.init(now)
+        previous_record = self.__head()
+        previous_record_dt = previous_record.next() if previous_record is not None else None
+
+        new_entries: typing.List[typing.List[typing.Any]] = []
+        try:
+            for record in records:
+                record.init(now)
+                new_entries.append(self.__entry(record))
+        finally:
+            # records that have been initialized before a failure are submitted still (just like separate
+            # "submit_record" calls do), so they are not left initialized but not scheduled
+            self.__submit_entries(new_entries, now, previous_record_dt)
+
+    def __submit_entries(
+        self,
+        new_entries: typing.List[typing.List[typing.Any]],
+        now: datetime.datetime,
+        previous_record_dt: typing.Optional[datetime.datetime]
+    ) -> None:
+        """ Save new entries to the heap and emit the :attr:`.CronTaskSource.polling_update` signal if required
+
+        :param new_entries: heap entries to save
+        :param now: datetime with which records were initialized
+        :param previous_record_dt: the closest datetime before the new entries
+        """
+        if len(new_entries) == 1:
+            heapq.heappush(self.__records, new_entries[0])
+        elif new_entries:
+            self.__records.extend(new_entries)  # a single heapify is linear while separate pushes are not
+            heapq.heapify(self.__records)
 
-        current_record_dt = record.next()
-        previous_record_dt = self.__records[0].next() if self.__records else None
+        for entry in new_entries:
+            self.__entries[entry[2]] = entry
 
-        heapq.heappush(self.__records, record)
+        current_record = self.__head()
+        if current_record is None:
+            return
 
+        current_record_dt = current_record.next()
         if previous_record_dt is None or previous_record_dt > current_record_dt:
             delta = current_record_dt - now
             self.emit(self.polling_update, delta.seconds)
 
-    def __emit_records(self) -> None:
+    def __emit_records(self, now: datetime.datetime) -> None:
         """ Check whether there are records that are ready to be executed (their time has come)
+
+        :param now: current datetime
         """
-        records_expired = True
-        now = self.__now()
         records_to_emit = []
 
-        while records_expired and self.__records:
-            cron_record = self.__records[0]
-            if cron_record.next() <= now:
-                records_to_emit.append(heapq.heappop(self.__records))
-            else:
-                records_expired = False
+        cron_record = self.__head()
+        now_timestamp = now.timestamp()
+        while cron_record is not None and self.__records[0][0] <= now_timestamp:  # the heap top is not discarded
+            heapq.heappop(self.__records)
+            self.__entries.pop(cron_record)
+            records_to_emit.append(cron_record)
+            cron_record = self.__head()
 
         for cron_record in records_to_emit:
             cron_record.commit()
             self.emit(self.task_scheduled, cron_record.record())
-            heapq.heappush(self.__records, cron_record)
+            self.__push(cron_record)
 
     def poll(self) -> typing.Optional[int]:
         """ Trigger emitting records which time has come. And return number of seconds to wait for next records
@@ -371,30 +450,34 @@ class CronTaskSource(ScheduleSourceProto):
         """
         " ScheduleSourceProto.task_scheduled will be emitted if require "
 
-        if not self.__records:
+        if not self.__entries:
             return None
 
-        self.__emit_records()
-        cron_record = self.__records[0]
-        delta = self.__now() - cron_record.next()
+        now = self.__now()
+        self.__emit_records(now)
+        cron_record = self.__head()
+        delta = now - cron_record.next()  # type: ignore[union-attr]  # there is at least one record
         return delta.seconds
 
     def records(self) -> typing.Generator[CronScheduleRecord, None, None]:
         """ Return generator that yields record this source has
         """
         for i in self.__records.copy():
-            yield i
+            if i[2] is not None:
+                yield i[2]
 
     def discard_record(self, record: CronScheduleRecord) -> None:
         """ Remove a record from this source
 
         :param record: a record to remove from this source
         """
-        for i in range(len(self.__records)):
-            if self.__records[i] == record:
-                self.__records.pop(i)
-                if self.__records:
-                    delta = self.__now() - self.__records[0].next()
-                    self.emit(self.polling_update, delta.seconds)
-                return
-        raise ValueError('Unable to find a record')
+        try:
+            entry = self.__entries.pop(record)
+        except KeyError:
+            raise ValueError('Unable to find a record')
+
+        entry[2] = None
+        head_record = self.__head()
+        if head_record is not None:
+            delta = self.__now() - head_record.next()
+            self.emit(self.polling_update, delta.seconds)
@@ -19,10 +19,11 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
+import heapq
+import itertools
+import time
 import typing
 
-from datetime import datetime, timezone
-
 from pyknic.lib.signals.proto import Signal
 from pyknic.lib.signals.source import SignalSource
 
@@ -43,25 +44,94 @@ class SchedulerQueue(SignalSource):
         """ Create a new queue with postpone records
         """
         SignalSource.__init__(self)
-        self.__postponed_records: typing.List[ScheduleRecordProto] = []
+        # records (with their group ids) are kept by their sequence numbers, so dicts keep them in order of
+        # postponing and a record may be removed without moving the others
+        self.__postponed_records: typing.Dict[int, typing.Tuple[ScheduleRecordProto, typing.Optional[str]]] = {}
+        self.__sequence = itertools.count()
+
+        # a heap of (ttl, sequence_number) pairs for records with ttl. Entries of records that have left the queue
+        # are skipped when they reach the heap top
+        self.__ttl_heap: typing.List[typing.Tuple[typing.Union[int, float], int]] = []
+
+        # sequence numbers of postponed records by their group ids (dicts are used as ordered sets)
+        self.__groups: typing.Dict[str, typing.Dict[int, None]] = {}
 
     def __len__(self) -> int:
         """ Return number of postponed tasks
         """
         return len(self.__postponed_records)
 
+    def __append(
+        self, record: ScheduleRecordProto, group_id: typing.Optional[str], ttl: typing.Union[int, float, None]
+    ) -> None:
+        """ Save a record at the end of a queue
+
+        :param record: record to save
+        :param group_id: the record's group id (record properties are requested once by a caller)
+        :param ttl: the record's ttl
+        """
+        seq = next(self.__sequence)
+        self.__postponed_records[seq] = (record, group_id)
+
+        if group_id is not None:
+            self.__groups.setdefault(group_id, {})[seq] = None
+
+        if ttl is not None:
+            if len(self.__ttl_heap) > 2 * len(self.__postponed_records):
+                # there are too many entries of records that have left the queue
+                self.__ttl_heap = [x for x in self.__ttl_heap if x[1] in self.__postponed_records]
+                heapq.heapify(self.__ttl_heap)
+            heapq.heappush(self.__ttl_heap, (ttl, seq))
+
+    def __remove(self, seq: int) -> typing.Optional[ScheduleRecordProto]:
+        """ Remove a record from a queue and return it (or return None if there is no such record already)
+
+        :param seq: sequence number of a record
+        """
+        entry = self.__postponed_records.pop(seq, None)
+        if entry is None:
+            return None
+
+        record, group_id = entry
+        if group_id is not None:
+            group_records = self.__groups[group_id]
+            del group_records[seq]
+            if not group_records:
+                del self.__groups[group_id]
+        return record
+
+    def __expire(self, utc_now: float) -> None:
+        """ Remove records which ttl has passed and emit the :attr:`.SchedulerQueue.task_expired` signal for each
+        of them
+
+        :param utc_now: current POSIX timestamp
+        """
+        ttl_heap = self.__ttl_heap
+        if not ttl_heap or ttl_heap[0][0] >= utc_now:
+            return  # nothing has expired since the last check
+
+        expired_records = []
+        while ttl_heap and ttl_heap[0][0] < utc_now:
+            record = self.__remove(heapq.heappop(ttl_heap)[1])
+            if record is not None:
+                expired_records.append(record)
+
+        self.emit_many(self.task_expired, expired_records)
+
+    def __drop(self, records: typing.List[int]) -> None:
+        """ Remove records from a queue and emit the :attr:`.SchedulerQueue.task_dropped` signal for each of them.
+        Signals are emitted when all the records are removed already, so callbacks see a consistent queue
+
+        :param records: sequence numbers of records to drop
+        """
+        self.emit_many(self.task_dropped, [self.__remove(x) for x in records])
+
     def __drop_all(self, group_id: str) -> None:
         """ Drop from a queue all record with the specified group_id
 
         :param group_id: id of a group which records should be dropped
         """
-        dropped_records = 0
-        for i in range(len(self.__postponed_records)):
-            check_record = self.__postponed_records[i - dropped_records]
-            if check_record.group_id() == group_id:
-                self.__postponed_records.pop(i - dropped_records)
-                dropped_records += 1
-                self.emit(self.task_dropped, check_record)
+        self.__drop(list(self.__groups.get(group_id, ())))
 
     def __keep_first(self, group_id: str) -> bool:
         """ Try to keep the earliest record of the same group. Other records of the same group will be dropped
@@ -70,54 +140,75 @@ class SchedulerQueue(SignalSource):
 
         :return: return True if the earliest record was found and return False otherwise
         """
-        first_found = False
-        dropped_records = 0
-        for i in range(len(self.__postponed_records)):
-            check_record = self.__postponed_records[i - dropped_records]
-            if check_record.group_id() == group_id:
-                if first_found:
-                    self.__postponed_records.pop(i - dropped_records)
-                    self.emit(self.task_dropped, check_record)
-                    dropped_records += 1
-                else:
-                    first_found = True
-        return first_found
+        group_records = list(self.__groups.get(group_id, ()))
+        self.__drop(group_records[1:])
+        return len(group_records) > 0
 
-    def postpone(self, record: ScheduleRecordProto) -> None:
-        """ Postpone a record (or drop it because of policy and/or ttl)
+    def __expired(self, record: ScheduleRecordProto, ttl: typing.Union[int, float, None]) -> bool:
+        """ Check whether a record's ttl has passed and emit the :attr:`.SchedulerQueue.task_expired` signal if it
+        has
 
-        :param record: record to postpone
+        :param record: record to check
+        :param ttl: the record's ttl
         """
-        ttl = record.ttl()
-        group_id = record.group_id()
-        postpone_policy = record.postpone_policy()
-
-        if postpone_policy == ScheduledTaskPostponePolicy.drop:
-            self.emit(self.task_dropped, record)
-            return
-
-        if ttl is not None and ttl < datetime.now(timezone.utc).timestamp():
+        if ttl is not None and ttl < time.time():
             self.emit(self.task_expired, record)
-            return
+            return True
+        return False
+
+    def __postpone_drop(
+        self, record: ScheduleRecordProto, group_id: typing.Optional[str], ttl: typing.Union[int, float, None]
+    ) -> None:
+        """ Postpone a record with the :attr:`.ScheduledTaskPostponePolicy.drop` policy
+        """
+        self.emit(self.task_dropped, record)
 
-        if postpone_policy == ScheduledTaskPostponePolicy.wait or group_id is None:
-            self.__postponed_records.append(record)
+    def __postpone_wait(
+        self, record: ScheduleRecordProto, group_id: typing.Optional[str], ttl: typing.Union[int, float, None]
+    ) -> None:
+        """ Postpone a record with the :attr:`.ScheduledTaskPostponePolicy.wait` policy
+        """
+        if not self.__expired(record, ttl):
+            self.__append(record, group_id, ttl)
             self.emit(self.task_postponed, record)
-            return
 
-        if postpone_policy == ScheduledTaskPostponePolicy.keep_last:
-            self.__drop_all(group_id)
-            self.__postponed_records.append(record)
+    def __postpone_keep_last(
+        self, record: ScheduleRecordProto, group_id: typing.Optional[str], ttl: typing.Union[int, float, None]
+    ) -> None:
+        """ Postpone a record with the :attr:`.ScheduledTaskPostponePolicy.keep_last` policy
+        """
+        if not self.__expired(record, ttl):
+            if group_id is not None:
+                self.__drop_all(group_id)
+            self.__append(record, group_id, ttl)
             self.emit(self.task_postponed, record)
-            return
 
-        if postpone_policy == ScheduledTaskPostponePolicy.keep_first:
-            if not self.__keep_first(group_id):
-                self.__postponed_records.append(record)
+    def __postpone_keep_first(
+        self, record: ScheduleRecordProto, group_id: typing.Optional[str], ttl: typing.Union[int, float, None]
+    ) -> None:
+        """ Postpone a record with the :attr:`.ScheduledTaskPostponePolicy.keep_first` policy
+        """
+        if not self.__expired(record, ttl):
+            if group_id is None or not self.__keep_first(group_id):
+                self.__append(record, group_id, ttl)
                 self.emit(self.task_postponed, record)
             else:
                 self.emit(self.task_dropped, record)
 
+    __postpone_handlers__ = {
+        ScheduledTaskPostponePolicy.drop: __postpone_drop,
+        ScheduledTaskPostponePolicy.wait: __postpone_wait,
+        ScheduledTaskPostponePolicy.keep_last: __postpone_keep_last,
+        ScheduledTaskPostponePolicy.keep_first: __postpone_keep_first,
+    }
+
+    def postpone(self, record: ScheduleRecordProto) -> None:
+        """ Postpone a record (or drop it because of policy and/or ttl)
+
+        :param record: record to postpone
+        """
+        self.__postpone_handlers__[record.postpone_policy()](self, record, record.group_id(), record.ttl())
+
     def next_record(
         self,
         filter_fn: typing.Optional[typing.Callable[[ScheduleRecordProto], bool]] = None
@@ -130,22 +221,21 @@ class SchedulerQueue(SignalSource):
         :return: return a record that should be executed next or return None if no suitable record is found
         """
 
-        utc_now = datetime.now(timezone.utc).timestamp()
-        dropped_records = 0
+        self.__expire(time.time())
 
-        for i in range(len(self.__postponed_records)):
-            record = self.__postponed_records[i - dropped_records]
-
-            ttl = record.ttl()
-            if ttl is not None and ttl < utc_now:
-                self.__postponed_records.pop(i - dropped_records)
-                self.emit(self.task_expired, record)
-                dropped_records += 1
-                continue
+        for seq, (record, _) in self.__postponed_records.items():
+            if filter_fn is None or filter_fn(record):
+                return self.__remove(seq)
+        return None
 
-            if filter_fn and not filter_fn(record):
-                continue
+    def drain(self) -> typing.List[ScheduleRecordProto]:
+        """ Remove all the records from a queue and return them (in order of postponing). Records which ttl has
+        passed are dropped with the :attr:`.SchedulerQueue.task_expired` signal and are not returned
+        """
+        self.__expire(time.time())
 
-            self.__postponed_records.pop(i - dropped_records)
-            return record
-        return None
+        result = [x for x, _ in self.__postponed_records.values()]
+        self.__postponed_records.clear()
+        self.__groups.clear()
+        self.__ttl_heap.clear()
+        return result
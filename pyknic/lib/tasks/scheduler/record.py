@@ -19,6 +19,7 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
 import typing
 
 from pyknic.lib.tasks.proto import ScheduleRecordProto, TaskProto, ScheduledTaskPostponePolicy, ScheduleSourceProto
@@ -28,6 +29,10 @@ class ScheduleRecord(ScheduleRecordProto):
     """ The :class:`.ScheduleRecordProto` implementation. Implementation is pretty straightforward
     """
 
+    __slots__ = (
+        '__task', '__source', '__group_id', '__ttl', '__simultaneous_runs', '__postpone_policy', '__weakref__'
+    )
+
     def __init__(
         self,
         task: TaskProto,
@@ -47,7 +52,9 @@ class ScheduleRecord(ScheduleRecordProto):
         """
         self.__task = task
         self.__source = source
-        self.__group_id = group_id
+        # equal ids of different records are the same object, so group look-ups and comparisons succeed on
+        # the identity check (str subclasses may not be interned, so they are kept as is)
+        self.__group_id = sys.intern(group_id) if type(group_id) is str else group_id
         self.__ttl = ttl
         self.__simultaneous_runs = simultaneous_runs if simultaneous_runs is not None else 0
         self.__postpone_policy = postpone_policy if postpone_policy else ScheduledTaskPostponePolicy.wait
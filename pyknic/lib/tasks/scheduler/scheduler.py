@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
-import functools
 import typing
 import weakref
 
@@ -38,6 +37,14 @@ class Scheduler(SchedulerProto, TaskProto):
     """ The :class:`.SchedulerProto` class implementation
     """
 
+    __signal_links__ = (  # executor's signals that are resent by a scheduler
+        (SchedulerExecutor.scheduled_task_dropped, SchedulerProto.scheduled_task_dropped),
+        (SchedulerExecutor.scheduled_task_postponed, SchedulerProto.scheduled_task_postponed),
+        (SchedulerExecutor.scheduled_task_expired, SchedulerProto.scheduled_task_expired),
+        (SchedulerExecutor.scheduled_task_started, SchedulerProto.scheduled_task_started),
+        (SchedulerExecutor.scheduled_task_completed, SchedulerProto.scheduled_task_completed),
+    )
+
     def __init__(
         self,
         threads_number: typing.Optional[int] = None,
@@ -52,32 +59,23 @@ class Scheduler(SchedulerProto, TaskProto):
         :param thread_cr_timeout: same as the "thread_cr_timeout" argument in :meth:`.ThreadExecutor.__init__`
         :param task_timeout: same as the "task_timeout" argument in :meth:`SchedulerExecutor.await_tasks`
         """
-        SchedulerProto.__init__(self)
-        TaskProto.__init__(self)
+        SchedulerProto.__init__(self)  # the TaskProto.__init__ call is omitted, since both of them initialize
+        # the same SignalSource
 
         self.__executor = SchedulerExecutor(threads_number, executor_cr_timeout, thread_cr_timeout)
         self.__task_timeout = task_timeout
         self.__holder = CallbacksHolder()
-        self.__sources: weakref.WeakSet[ScheduleSourceProto] = weakref.WeakSet()  # protects from double subscriptions
-        # TODO: think of removing this "self.__sources" -- it will make code cleaner
+        # subscribed sources (protects from double subscriptions). Every source has the same callback
+        self.__sources: 'weakref.WeakSet[ScheduleSourceProto]' = weakref.WeakSet()
 
         self.__task_scheduled_clbk = BoundedCallback(self.__task_scheduled)
 
-        def link_signals(source_signal: Signal, target_signal: Signal) -> None:
+        for source_signal, target_signal in self.__signal_links__:
             self.__executor.callback(
                 source_signal,
-                self.__holder.keep_callback(
-                    SignalResender(self, target_signal=target_signal),
-                    self
-                )
+                self.__holder.keep_callback(SignalResender(self, target_signal=target_signal), self)
             )
 
-        link_signals(SchedulerExecutor.scheduled_task_dropped, SchedulerProto.scheduled_task_dropped)
-        link_signals(SchedulerExecutor.scheduled_task_postponed, SchedulerProto.scheduled_task_postponed)
-        link_signals(SchedulerExecutor.scheduled_task_expired, SchedulerProto.scheduled_task_expired)
-        link_signals(SchedulerExecutor.scheduled_task_started, SchedulerProto.scheduled_task_started)
-        link_signals(SchedulerExecutor.scheduled_task_completed, SchedulerProto.scheduled_task_completed)
-
     def __task_scheduled(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
         """ A task (value) has been scheduled so this callback is processing it
 
@@ -111,7 +109,7 @@ class Scheduler(SchedulerProto, TaskProto):
         """
         assert(not self.__executor.queue_proxy().is_inside())  # this prevents queue_proxy from self-blocking
         try:
-            self.__executor.queue_proxy().exec(functools.partial(self.__subscribe, schedule_source), blocking=True)
+            self.__executor.queue_proxy().exec(self.__subscribe, blocking=True, args=(schedule_source, ))
         except QueueCallbackException as e:
             raise e.__cause__  # type: ignore[misc]  # it's ok
 
@@ -122,10 +120,9 @@ class Scheduler(SchedulerProto, TaskProto):
         """
         assert(self.__executor.queue_proxy().is_inside())
 
-        try:
-            self.__sources.remove(schedule_source)
-        except KeyError:
+        if schedule_source not in self.__sources:
             raise ValueError('Unknown source is requested to unsubscribe')
+        self.__sources.discard(schedule_source)
 
         if iscapable(schedule_source, ScheduleSourceProto.scheduler_feedback):
             schedule_source.scheduler_feedback(self, SchedulerFeedback.source_unsubscribed)
@@ -140,7 +137,7 @@ class Scheduler(SchedulerProto, TaskProto):
         """
         assert(not self.__executor.queue_proxy().is_inside())  # this prevents queue_proxy from self-blocking
         try:
-            self.__executor.queue_proxy().exec(functools.partial(self.__unsubscribe, schedule_source), blocking=True)
+            self.__executor.queue_proxy().exec(self.__unsubscribe, blocking=True, args=(schedule_source, ))
         except QueueCallbackException as e:
             raise e.__cause__  # type: ignore[misc]  # it's ok
 
@@ -159,9 +156,8 @@ class Scheduler(SchedulerProto, TaskProto):
         """
         assert(self.__executor.queue_proxy().is_inside())
 
-        for source in self.__sources.copy():
-            if source:
-                self.__unsubscribe(source)
+        for source in list(self.__sources):
+            self.__unsubscribe(source)
 
     def stop(self) -> None:
         """ Stop this schedule
@@ -20,11 +20,10 @@
 # along with pyknic.  If not, see <http://www.gnu.org/licenses/>.
 
 import enum
-import functools
+import time
 import typing
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
 
 from pyknic.lib.capability import iscapable
 from pyknic.lib.tasks.proto import ScheduleRecordProto, TaskProto, ScheduledTaskPostponePolicy, NoSuchTaskError
@@ -70,6 +69,9 @@ class SchedulerExecutor(SignalSource):
         """
         record: ScheduleRecordProto           # record that submitted a task
         state: 'SchedulerExecutor.TaskState'  # state of a task
+        group_id: typing.Optional[str] = None  # the record's group id (is requested once)
+        simultaneous_runs: int = 0             # the record's simultaneous runs (is requested once)
+        stop_fn: typing.Optional[typing.Callable[[], None]] = None  # a method that stops (or terminates) a task
 
     def __init__(
         self,
@@ -90,6 +92,9 @@ class SchedulerExecutor(SignalSource):
         self.__thread_executor = ThreadExecutor(threads_number, executor_cr_timeout, thread_cr_timeout)
 
         self.__tasks: typing.Dict[TaskProto, 'SchedulerExecutor.TaskDescriptor'] = dict()
+        self.__running_groups: typing.Dict[str, int] = dict()  # number of started tasks by group ids
+        self.__running_tasks: typing.Dict[TaskProto, None] = dict()  # started tasks (in order of start)
+        self.__drain_scheduled = False  # whether the "__run_postponed_tasks" call is in the queue already
 
         self.__holder = CallbacksHolder()
 
@@ -131,13 +136,27 @@ class SchedulerExecutor(SignalSource):
         self.__thread_executor.wait_task(value)
         self.__thread_executor.complete_task(value)
         descriptor = self.__tasks.pop(value)
+        self.__running_tasks.pop(value, None)
+
+        group_id = descriptor.group_id
+        if group_id is not None and descriptor.state == SchedulerExecutor.TaskState.started:
+            running_tasks = self.__running_groups[group_id] - 1
+            if running_tasks:
+                self.__running_groups[group_id] = running_tasks
+            else:
+                del self.__running_groups[group_id]
+
         self.emit(SchedulerExecutor.scheduled_task_completed, descriptor.record)
-        self.__proxy.exec(self.__run_postponed_tasks)
+
+        if not self.__drain_scheduled:  # a single queued call will process every slot freed before it runs
+            self.__proxy.exec(self.__run_postponed_tasks)
+            self.__drain_scheduled = True
 
     def __run_postponed_tasks(self) -> None:
         """ This callback is for postponed tasks execution
         """
         assert(self.__proxy.is_inside())
+        self.__drain_scheduled = False
 
         while True:
             try:
@@ -150,31 +169,40 @@ class SchedulerExecutor(SignalSource):
                 break
 
     def __exec_task(self, record: ScheduleRecordProto, context: ThreadExecutor.Context) -> None:
-        """ This callback executes a record (a task)
+        """ This callback executes a record (a task). It is called by other queue callbacks only, which check
+        the queue thread already
 
         :param record: a record to execute
         :param context: context with which a slot for execution has been allocated
         """
-        assert(self.__proxy.is_inside())
-
         task = record.task()
-        self.__tasks[task].state = SchedulerExecutor.TaskState.started
+        descriptor = self.__tasks[task]
+        descriptor.state = SchedulerExecutor.TaskState.started
+        self.__running_tasks[task] = None
+
+        group_id = descriptor.group_id
+        if group_id is not None:
+            self.__running_groups[group_id] = self.__running_groups.get(group_id, 0) + 1
+
         context.submit_task(task)
         self.emit(SchedulerExecutor.scheduled_task_started, record)
 
-    def __postpone(self, record: ScheduleRecordProto) -> None:
-        """ This callback postpones or drops a record
+    def __postpone(
+        self, record: ScheduleRecordProto, task: TaskProto, descriptor: 'SchedulerExecutor.TaskDescriptor'
+    ) -> None:
+        """ This callback postpones or drops a record. It is called by the :meth:`.SchedulerExecutor.__submit`
+        method only, which checks the queue thread already
 
         :param record: a record to postpone
+        :param task: the record's task
+        :param descriptor: the task's descriptor
         """
-        assert(self.__proxy.is_inside())
-
-        if record.postpone_policy() == ScheduledTaskPostponePolicy.drop:
-            self.__tasks.pop(record.task())
+        if record.postpone_policy() is ScheduledTaskPostponePolicy.drop:
+            del self.__tasks[task]
             self.emit(SchedulerExecutor.scheduled_task_dropped, record)
             return
 
-        self.__tasks[record.task()].state = SchedulerExecutor.TaskState.pending
+        descriptor.state = SchedulerExecutor.TaskState.pending
         self.emit(SchedulerExecutor.scheduled_task_postponed, record)
         self.__scheduler_queue.postpone(record)
 
@@ -186,36 +214,49 @@ class SchedulerExecutor(SignalSource):
         assert(self.__proxy.is_inside())
 
         ttl = record.ttl()
-        if ttl is not None and ttl < datetime.now(timezone.utc).timestamp():
+        if ttl is not None and ttl < time.time():
             self.emit(SchedulerExecutor.scheduled_task_expired, record)
             return
 
-        if record.task() in self.__tasks:
+        task = record.task()
+        if task in self.__tasks:
             raise ValueError('A submitted task is registered already')
 
-        self.__tasks[record.task()] = SchedulerExecutor.TaskDescriptor(
-            record, SchedulerExecutor.TaskState.submitted
+        if iscapable(task, TaskProto.stop):
+            stop_fn = task.stop
+        elif iscapable(task, TaskProto.terminate):
+            stop_fn = task.terminate
+        else:
+            stop_fn = None
+
+        descriptor = SchedulerExecutor.TaskDescriptor(
+            record, SchedulerExecutor.TaskState.submitted, record.group_id(), record.simultaneous_runs(), stop_fn
         )
+        self.__tasks[task] = descriptor
 
-        if not self.__filter_record(record):
-            self.__postpone(record)
+        if not self.__filter_descriptor(descriptor):
+            self.__postpone(record, task, descriptor)
             return
 
         try:
             with self.__thread_executor.executor_context() as c:
                 self.__exec_task(record, c)
         except NoFreeSlotError:
-            self.__postpone(record)
+            self.__postpone(record, task, descriptor)
 
     def submit(self, record: ScheduleRecordProto, blocking: bool = False) -> None:
         """ Try to execute a record or try to postpone it
 
         :param record: a record to run
-        :param blocking: whether we should wait for result or not (a queue thread may be deadlocked because
-        of the True value)
+        :param blocking: whether we should wait for result or not. A blocking request from the queue thread
+        is processed in place
         """
+        if blocking and self.__proxy.is_inside():
+            self.__submit(record)  # a blocking request from the queue thread would never be processed
+            return
+
         try:
-            self.__proxy.exec(functools.partial(self.__submit, record), blocking=blocking)
+            self.__proxy.exec(self.__submit, blocking=blocking, args=(record, ))
         except QueueCallbackException as e:
             raise e.__cause__  # type: ignore[misc]  # it's ok
 
@@ -231,6 +272,14 @@ class SchedulerExecutor(SignalSource):
         """
         return len(self.__scheduler_queue) > 0 or any(self.__thread_executor.tasks())
 
+    def __run_postponed_and_check(self) -> bool:
+        """ Execute postponed tasks and check are there tasks to execute (within a single queue request)
+
+        :return: True if there are tasks to execute and False otherwise
+        """
+        self.__run_postponed_tasks()
+        return self.__has_tasks()
+
     def await_tasks(self, task_timeout: typing.Union[int, float, None] = None) -> None:
         """ Wait for tasks to finish
 
@@ -246,23 +295,21 @@ class SchedulerExecutor(SignalSource):
                     # there may be a slight race condition between thread_executor.tasks() and wait_task calls
                     pass
 
-            self.__proxy.exec(self.__run_postponed_tasks, blocking=True)
-            has_tasks = self.__proxy.exec(self.__has_tasks, blocking=True)
+            has_tasks = self.__proxy.exec(self.__run_postponed_and_check, blocking=True)
 
     def __filter_record(self, record: ScheduleRecordProto) -> bool:
         """ A filter for the :meth:`.SchedulerQueue.next_record` method that checks the "simultaneous_runs" option
         """
-        group_id = record.group_id()
-        simultaneous_runs = record.simultaneous_runs()
+        return self.__filter_descriptor(self.__tasks[record.task()])
 
-        def sim_runs(x: SchedulerExecutor.TaskDescriptor) -> int:
-            return 1 if (x.state == SchedulerExecutor.TaskState.started and x.record.group_id() == group_id) else 0
+    def __filter_descriptor(self, descriptor: 'SchedulerExecutor.TaskDescriptor') -> bool:
+        """ Check the "simultaneous_runs" option of a submitted task
+        """
+        group_id = descriptor.group_id
+        simultaneous_runs = descriptor.simultaneous_runs
 
         if group_id is not None and simultaneous_runs > 0:
-            group_count = sum(map(sim_runs, self.__tasks.values()))
-            if group_count >= simultaneous_runs:
-                return False
-
+            return self.__running_groups.get(group_id, 0) < simultaneous_runs
         return True
 
     def __cancel_postponed_tasks(self) -> None:
@@ -270,11 +317,10 @@ class SchedulerExecutor(SignalSource):
         """
         assert (self.__proxy.is_inside())
 
-        next_record = self.__scheduler_queue.next_record()
-        while next_record:
-            self.__tasks.pop(next_record.task())
-            self.emit(SchedulerExecutor.scheduled_task_dropped, next_record)
-            next_record = self.__scheduler_queue.next_record()
+        dropped_records = self.__scheduler_queue.drain()
+        for record in dropped_records:
+            del self.__tasks[record.task()]
+        self.emit_many(SchedulerExecutor.scheduled_task_dropped, dropped_records)
 
     def cancel_postponed_tasks(self) -> None:
         """ Request to cancel all the pending tasks
@@ -286,48 +332,33 @@ class SchedulerExecutor(SignalSource):
         """
         assert(self.__proxy.is_inside())
 
-        for task in self.__tasks:
-            if iscapable(task, TaskProto.stop):
-                task.stop()
-            elif iscapable(task, TaskProto.terminate):
-                task.terminate()
+        for descriptor in self.__tasks.values():
+            if descriptor.stop_fn is not None:
+                descriptor.stop_fn()
 
     def stop_running_tasks(self) -> None:
         """ Request to cancel all the running tasks
         """
         self.__proxy.exec(self.__stop_running_tasks, blocking=True)
 
-    def __tasks_filter(
-        self,
-        filter_fn: typing.Callable[['SchedulerExecutor.TaskDescriptor'], bool]
-    ) -> typing.Tuple[TaskProto, ...]:
-        """ This method returns tasks which descriptors is suitable
+    def __started_tasks(self, started: bool) -> typing.Tuple[TaskProto, ...]:
+        """ This method returns tasks that are started (or tasks that are not)
 
-        :param filter_fn: filter function that checks descriptors, this function must return True
-        for every suitable task
+        :param started: whether started tasks should be returned or tasks that are waiting for execution
         """
         assert(self.__proxy.is_inside())
 
-        return tuple((x for x, y in self.__tasks.items() if filter_fn(y)))
+        running_tasks = self.__running_tasks
+        if started:
+            return tuple(running_tasks)
+        return tuple((x for x in self.__tasks if x not in running_tasks))
 
     def running_tasks(self) -> typing.Tuple[TaskProto, ...]:
         """ Return tasks that are running at the moment
         """
-        return self.__proxy.exec(  # type: ignore[no-any-return]
-            functools.partial(
-                self.__tasks_filter,
-                lambda x: x.state == SchedulerExecutor.TaskState.started
-            ),
-            blocking=True
-        )
+        return self.__proxy.exec(self.__started_tasks, blocking=True, args=(True, ))  # type: ignore[no-any-return]
 
     def pending_tasks(self) -> typing.Tuple[TaskProto, ...]:
         """ Return tasks that are waiting for execution
         """
-        return self.__proxy.exec(  # type: ignore[no-any-return]
-            functools.partial(
-                self.__tasks_filter,
-                lambda x: x.state != SchedulerExecutor.TaskState.started
-            ),
-            blocking=True
-        )
+        return self.__proxy.exec(self.__started_tasks, blocking=True, args=(False, ))  # type: ignore[no-any-return]
@@ -114,7 +114,11 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
         CriticalResource.__init__(self, executor_cr_timeout)
         SignalSource.__init__(self)
 
-        self.__threads_semaphore = threading.Semaphore(threads_number) if threads_number else None
+        # free slots are counted under a plain lock, that is cheaper than the threading.Semaphore (which is
+        # implemented in python with a condition)
+        self.__limited_slots = bool(threads_number)
+        self.__free_slots = threads_number if threads_number else 0
+        self.__slots_lock = threading.Lock()
         self.__thread_cr_timeout = thread_cr_timeout
 
         self.__running_threads: typing.Dict[TaskProto, ThreadedTask] = dict()
@@ -126,7 +130,7 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
 
         :param task: a task to start
         """
-        task_id = task.task_name() if task.task_name() else str(task)
+        task_id = task.task_name() or str(task)
         result = ThreadedTask(task, self.__thread_cr_timeout, thread_name=f'pyknic:thexec:{task_id}')  # noqa: E231
 
         with self.critical_context(description=repr(self.__submit_task)):
@@ -144,8 +148,9 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
     def __release_slot(self) -> None:
         """ Release a slot (if they are limited)
         """
-        if self.__threads_semaphore:
-            self.__threads_semaphore.release()
+        if self.__limited_slots:
+            with self.__slots_lock:
+                self.__free_slots += 1
 
     def submit_task(self, task: TaskProto) -> bool:
         """ The :meth:`.TaskExecutorProto.submit_task` implementation
@@ -162,15 +167,17 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
         """ The :meth:`.TaskExecutorProto.complete_task` implementation
         """
         with self.critical_context(description=repr(self.complete_task)):
-            if task not in self.__running_threads:
+            running_threads = self.__running_threads
+            try:
+                threaded_task = running_threads[task]
+            except KeyError:
                 raise NoSuchTaskError('Unable to find a task')
-            threaded_task = self.__running_threads[task]
 
             join_result = threaded_task.join()
             if not join_result:
                 return False
 
-            self.__running_threads.pop(task)
+            del running_threads[task]
 
         self.__release_slot()
         return True
@@ -178,8 +185,11 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
     def executor_context(self) -> 'ThreadExecutor.Context':
         """ Allocate a slot for a task and return a context
         """
-        if self.__threads_semaphore and not self.__threads_semaphore.acquire(False):
-            raise NoFreeSlotError("Unable to allocate a slot of the executor's pool")
+        if self.__limited_slots:
+            with self.__slots_lock:
+                if not self.__free_slots:
+                    raise NoFreeSlotError("Unable to allocate a slot of the executor's pool")
+                self.__free_slots -= 1
 
         return ThreadExecutor.Context(self, self.__submit_task, self.__release_slot)
 
@@ -196,9 +206,10 @@ class ThreadExecutor(TaskExecutorProto, CriticalResource, SignalSource):
         """ The :meth:`.TaskExecutorProto.wait_task` implementation
         """
         with self.critical_context(description=repr(self.wait_task)):
-            if task not in self.__running_threads:
+            try:
+                threaded_task = self.__running_threads[task]
+            except KeyError:
                 raise NoSuchTaskError('Unable to find a task')
-            threaded_task = self.__running_threads[task]
 
         if timeout is None:
             threaded_task.wait()
@@ -29,7 +29,7 @@ from pyknic.lib.log import Logger
 from pyknic.lib.capability import iscapable
 from pyknic.lib.signals.extra import AsyncWatchDog
 from pyknic.lib.signals.proto import Signal
-from pyknic.lib.tasks.proto import TaskProto, TaskResult, TaskStartError
+from pyknic.lib.tasks.proto import TaskProto, TaskResult, TaskStartError, __empty_task_result__
 from pyknic.lib.tasks.plain_task import PlainTask
 from pyknic.lib.thread import CriticalResource
 
@@ -98,7 +98,7 @@ class ThreadedTask(TaskProto, CriticalResource):
             return
 
         self.emit(self.thread_ready, self.__task)
-        self.emit(self.task_completed, TaskResult())
+        self.emit(self.task_completed, __empty_task_result__)
 
     def __task_id(self) -> str:
         """ Return id of a task that is executed
@@ -116,6 +116,20 @@ class TestDatalog:
         log.append(entry_object)
         assert(signals_registry.dump(True) == [(log, DatalogProto.new_entry, entry_object)])
 
+        log.callback(DatalogProto.truncated, signals_registry)
+        log.append(2)
+        log.append(3)
+        signals_registry.dump(True)
+
+        log.truncate(3)
+        assert(signals_registry.dump(True) == [])  # nothing is removed
+
+        log.truncate(1)
+        assert(signals_registry.dump(True) == [(log, DatalogProto.truncated, [entry_object, 2])])
+
+        log.truncate(0)
+        assert(signals_registry.dump(True) == [(log, DatalogProto.truncated, [3])])
+
     @pytest.mark.parametrize(
         "test_cls", [
             DatalogPy,
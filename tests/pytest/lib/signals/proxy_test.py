@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import functools
 import gc
 import pytest
 import threading
 import typing
+import weakref
 
 from pyknic.lib.signals.extra import CallbackWrapper
 from pyknic.lib.signals.proto import Signal, SignalCallbackType, SignalSourceProto, SignalProxyProto
@@ -15,6 +17,10 @@ from pyknic.lib.signals.proxy import SignalProxy, QueueProxy, QueueProxyStateErr
 from fixtures.callbacks_n_signals import SignalsRegistry, CallbackRegistry
 
 
+def module_callback(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+    pass
+
+
 def test_exceptions() -> None:
     assert(issubclass(QueueProxyStateError, Exception) is True)
     assert(issubclass(QueueCallbackException, Exception) is True)
@@ -92,6 +98,51 @@ class TestSignalProxy:
         assert(signals_registry.dump(True) == [])
         assert(callbacks_registry.calls('test_callback') == 1)
 
+    def test_discard_proxy(self) -> None:
+
+        def callback1(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            pass
+
+        def callback2(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            pass
+
+        signal_proxy = SignalProxy()
+        wrappers1 = [weakref.ref(signal_proxy.proxy(callback1)) for _ in range(3)]
+        wrappers2 = [weakref.ref(signal_proxy.proxy(callback2)) for _ in range(3)]
+        gc.collect()
+        assert(all(x() is not None for x in wrappers1 + wrappers2))  # wrappers are kept by a proxy
+
+        signal_proxy.discard_proxy(callback1)
+        gc.collect()
+        assert(all(x() is None for x in wrappers1))
+        assert(all(x() is not None for x in wrappers2))
+
+        del callback2
+        gc.collect()
+        assert(all(x() is None for x in wrappers2))  # wrappers are released with an original callback
+
+    def test_discard_finalizers(self) -> None:
+
+        def callback(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            pass
+
+        signal_proxy = SignalProxy()
+        finalizers = len(weakref.finalize._registry)  # type: ignore[attr-defined]  # there is no public api
+        for _ in range(100):
+            signal_proxy.proxy(callback)
+            signal_proxy.discard_proxy(callback)
+        assert(len(weakref.finalize._registry) == finalizers)  # type: ignore[attr-defined]  # there is no public api
+
+    def test_proxy_collected(self) -> None:
+        signal_proxy = SignalProxy()
+        wrapper_ref = weakref.ref(signal_proxy.proxy(module_callback))
+        proxy_ref = weakref.ref(signal_proxy)
+
+        del signal_proxy
+        gc.collect()
+        assert(proxy_ref() is None)  # a long-lived callback keeps neither a proxy nor its wrappers alive
+        assert(wrapper_ref() is None)
+
 
 class TestQueueProxy:
 
@@ -166,6 +217,12 @@ class TestQueueProxy:
 
             assert(queue_proxy.exec(callback, blocking=True) is callback_result)
 
+    def test_exec_args(self) -> None:
+        queue_proxy = QueueProxy()
+
+        with ThreadRunner.task(queue_proxy):
+            assert(queue_proxy.exec(lambda x, y: x - y, blocking=True, args=(3, 1)) == 2)
+
     def test_exec_wait_exception(self) -> None:
         queue_proxy = QueueProxy()
         with ThreadRunner.task(queue_proxy):
@@ -220,3 +277,82 @@ class TestQueueProxy:
 
             assert(queue_proxy.exec(callback, blocking=True) is True)
             assert(callback() is False)
+
+    def test_multiple_producers(self) -> None:
+        queue_proxy = QueueProxy()
+        results: typing.List[typing.Tuple[int, int]] = []
+
+        def producer(producer_id: int) -> None:
+            for i in range(100):
+                queue_proxy.exec(functools.partial(results.append, (producer_id, i)))
+
+        with ThreadRunner.task(queue_proxy):
+            producers = [threading.Thread(target=producer, args=(x, )) for x in range(10)]
+            for p in producers:
+                p.start()
+            for p in producers:
+                p.join()
+
+        assert(len(results) == 1000)
+        for producer_id in range(10):
+            assert([x[1] for x in results if x[0] == producer_id] == list(range(100)))
+
+    def test_signals_after_stop(self, signals_registry: SignalsRegistry) -> None:
+        class Source(SignalSource):
+            signal1 = Signal()
+
+        queue_proxy = QueueProxy()
+        source = Source()
+        source.callback(Source.signal1, queue_proxy.proxy(signals_registry))  # arguments are passed positionally
+
+        with ThreadRunner.task(queue_proxy):
+            source.emit(Source.signal1)
+
+        source.emit(Source.signal1)  # the queue is stopped, so the signal is discarded silently
+        assert(signals_registry.dump(True) == [(source, Source.signal1, None)])
+
+    @pytest.mark.parametrize("flash_flush", [True, False])
+    def test_flash_flush(self, flash_flush: bool) -> None:
+        queue_proxy = QueueProxy(flash_flush=flash_flush)
+        blocker_started = threading.Event()
+        blocker_release = threading.Event()
+        results: typing.List[int] = []
+
+        def blocker() -> None:
+            blocker_started.set()
+            blocker_release.wait()
+
+        threaded_task = ThreadedTask(queue_proxy)
+        threaded_task.start()
+        queue_proxy.wait_initialization()
+
+        queue_proxy.exec(blocker)
+        blocker_started.wait()
+        for i in range(3):
+            queue_proxy.exec(functools.partial(results.append, i))
+
+        stop_thread = threading.Thread(target=queue_proxy.stop)
+        stop_thread.start()
+        while queue_proxy.is_running():
+            pass
+        blocker_release.set()
+        stop_thread.join()
+        threaded_task.wait()
+
+        assert(results == ([] if flash_flush else [0, 1, 2]))
+
+    def test_proxy_collected(self) -> None:
+        queue_proxy = QueueProxy()
+        wrapper = queue_proxy.proxy(module_callback)
+        proxy_ref = weakref.ref(queue_proxy)
+
+        del queue_proxy
+        gc.collect()
+        assert(proxy_ref() is None)  # wrappers do not keep a queue alive
+        wrapper(SignalSource(), Signal(), None)  # a signal is discarded silently
+
+    def test_wrapper_setup(self) -> None:
+        source = SignalSource()
+        wrapper = QueueProxy.Wrapper(lambda s, sig, v: None)
+        with pytest.raises(QueueProxyStateError):
+            wrapper(source, Signal(), None)
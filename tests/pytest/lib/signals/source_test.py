@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import gc
 import typing
 import pytest
 
@@ -31,11 +32,49 @@ class TestSignalSourceMeta:
 
         assert(C.signal1.__pyknic_signal_name__ == 'B.signal1')
         assert(C.signal2.__pyknic_signal_name__ == 'B.signal2')
+        assert(C.signal3.__pyknic_signal_name__ == 'C.signal3')
+        assert(C.__pyknic_signals__ == {B.signal1, B.signal2, C.signal3})  # type: ignore[attr-defined] # metaclass
+
+        class E(C):
+            signal1 = B.signal1  # the same signal may be declared again
+
+        assert(E.__pyknic_signals__ == C.__pyknic_signals__)  # type: ignore[attr-defined] # metaclass and mypy issues
+        assert(E.signal1.__pyknic_signal_name__ == 'B.signal1')
 
         with pytest.raises(TypeError):
             class D(B):
                 signal1 = Signal()  # signals may not be overridden
 
+    def test_mixin(self) -> None:
+
+        class Mixin:
+            signal1 = Signal()
+
+        class A(metaclass=SignalSourceMeta):
+            signal2 = Signal()
+
+        class B(Mixin, A):
+            pass
+
+        assert(B.__pyknic_signals__ == {Mixin.signal1, A.signal2})  # type: ignore[attr-defined] # metaclass
+        assert(Mixin.signal1.__pyknic_signal_name__ == 'Mixin.signal1')
+
+        class S(Mixin, SignalSource):
+            pass
+
+        S().emit(Mixin.signal1)  # a mixin signal is known to a source
+
+        class OtherMixin:
+            signal1 = Signal()
+
+        with pytest.raises(TypeError):
+            class C(Mixin, OtherMixin, A):  # bases may not declare different signals with the same name
+                pass
+
+        with pytest.raises(TypeError):
+            class D(B, OtherMixin):
+                pass
+
 
 class TestSignalSource:
 
@@ -123,3 +162,109 @@ class TestSignalSource:
 
         s.callback(Source.signal1, A.cls_callback)  # classmethods are ok
         s.callback(Source.signal1, A())  # callable objects are ok too
+
+    @pytest.mark.parametrize(
+        "test_cls", [
+            SignalSource,
+            CapabilitiesAndSignals,
+        ]
+    )
+    def test_strong_callbacks(self, test_cls: typing.Type[SignalSource]) -> None:
+
+        class Source(test_cls):  # type: ignore[valid-type, misc]  # mypy issues will be fixed in future releases
+            signal1 = Signal()
+
+        results = []
+
+        class A:
+            def callback(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+                results.append((source, signal, value))
+
+        s = Source()
+        s.callback(Source.signal1, A().callback, strong=True)  # bounded methods are ok since they are kept
+        s.callback(Source.signal1, (lambda *args: results.append(args)), strong=True)
+        gc.collect()
+
+        s.emit(Source.signal1)
+        assert(results == [(s, Source.signal1, None), (s, Source.signal1, None)])
+
+        a = A()
+        results.clear()
+        s.callback(Source.signal1, a.callback, strong=True)
+        s.callback(Source.signal1, a.callback, strong=True)  # callback is registered once
+        s.remove_callback(Source.signal1, a.callback)
+        s.emit(Source.signal1)
+        assert(len(results) == 2)
+
+        pytest.raises(UnknownSignalException, s.remove_callback, Source.signal1, a.callback)
+
+    def test_single_callback(self) -> None:
+
+        class Source(SignalSource):
+            signal1 = Signal(int)
+
+        results = []
+
+        class A:
+            __slots__ = ()  # objects of this class may not be referenced weakly
+
+            def __call__(self, source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+                results.append(value)
+
+        def callback(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            results.append(-value)
+
+        s = Source()
+        s.emit(Source.signal1, 0)  # there are no callbacks yet
+        pytest.raises(TypeError, s.emit, Source.signal1, 'foo')
+        pytest.raises(UnknownSignalException, s.remove_callback, Source.signal1, callback)
+
+        s.callback(Source.signal1, callback)
+        s.emit(Source.signal1, 1)
+        pytest.raises(TypeError, s.emit, Source.signal1, 'foo')  # value is checked anyway
+        assert(results == [-1])
+
+        del callback
+        gc.collect()
+        s.emit(Source.signal1, 2)
+        assert(results == [-1])
+
+        a = A()
+        s.callback(Source.signal1, a, strong=True)
+        s.emit(Source.signal1, 3)
+        assert(results == [-1, 3])
+
+        s.remove_callback(Source.signal1, a)
+        s.emit(Source.signal1, 4)
+        assert(results == [-1, 3])
+
+    def test_emit_many(self) -> None:
+
+        class Source(SignalSource):
+            signal1 = Signal(int)
+
+        results = []
+
+        def callback1(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            results.append(value)
+
+        def callback2(source: SignalSourceProto, signal: Signal, value: typing.Any) -> None:
+            results.append(-value)
+
+        s = Source()
+        pytest.raises(UnknownSignalException, s.emit_many, Signal(), [1])
+        s.emit_many(Source.signal1, [1, 2])  # there are no callbacks yet
+        pytest.raises(TypeError, s.emit_many, Source.signal1, ['foo'])
+
+        s.callback(Source.signal1, callback1)
+        s.emit_many(Source.signal1, [1, 2])
+        assert(results == [1, 2])
+
+        results.clear()
+        s.callback(Source.signal1, callback2)
+        s.emit_many(Source.signal1, (x for x in [1, 2]))
+        assert(sorted(results) == [-2, -1, 1, 2])
+
+        results.clear()
+        pytest.raises(TypeError, s.emit_many, Source.signal1, [3, 'foo', 4])
+        assert(sorted(results) == [-3, 3])  # values are checked one by one
@@ -26,6 +26,7 @@ class TestSingletonMeta:
         assert(SingletonClass.singleton() is None)
         SingletonClass.setup_singleton(value)
         assert(SingletonClass.singleton() is value)
+        assert({'x', 'pow'}.issubset(SingletonClass.__instance_attrs__))
 
         with pytest.raises(ValueError):
             SingletonClass.setup_singleton(BaseClass(6))
@@ -45,3 +46,4 @@ def test_create_singleton() -> None:
     singleton = create_singleton(value)
     assert(isinstance(singleton, SingletonMeta))
     assert(ABCMeta.__getattribute__(singleton, "__instance__") is value)
+    assert(ABCMeta.__getattribute__(singleton, "__instance_attrs__") == frozenset(dir(value)))
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import pytest
 import typing
 
 from pyknic.lib.tasks.plain_task import PlainTask
@@ -51,3 +52,28 @@ class TestPlainTask:
             (plain_task, TaskProto.task_started, None),
             (plain_task, TaskProto.task_completed, TaskResult(exception=callback_exception)),
         ])
+
+    def test_nothrow(self, callbacks_registry: 'CallbackRegistry', signals_registry: 'SignalsRegistry') -> None:
+        callback_result = object()
+        plain_task = PlainTask(callbacks_registry.callback(callback_result=callback_result), nothrow=True)
+        plain_task.callback(plain_task.task_started, signals_registry)
+        plain_task.callback(plain_task.task_completed, signals_registry)
+
+        plain_task.start()
+        assert(signals_registry.dump(True) == [
+            (plain_task, TaskProto.task_started, None),
+            (plain_task, TaskProto.task_completed, TaskResult(callback_result)),
+        ])
+
+        def exc() -> None:
+            raise ValueError('!')
+
+        plain_task = PlainTask(exc, nothrow=True)
+        plain_task.callback(plain_task.task_started, signals_registry)
+        plain_task.callback(plain_task.task_completed, signals_registry)
+
+        with pytest.raises(ValueError):
+            plain_task.start()
+        assert(signals_registry.dump(True) == [
+            (plain_task, TaskProto.task_started, None),
+        ])
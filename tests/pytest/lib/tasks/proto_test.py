@@ -12,7 +12,7 @@ from pyknic.lib.capability import iscapable, CapabilityDescriptor
 
 from pyknic.lib.tasks.proto import TaskStartError, TaskStopError, NoSuchTaskError, TaskProto
 from pyknic.lib.tasks.proto import TaskResult, ScheduleRecordProto, SchedulerProto, ScheduledTaskPostponePolicy
-from pyknic.lib.tasks.proto import TaskExecutorProto, ScheduleSourceProto
+from pyknic.lib.tasks.proto import TaskExecutorProto, ScheduleSourceProto, __empty_task_result__
 
 from fixtures.asyncio import pyknic_async_test
 
@@ -93,3 +93,12 @@ class TestScheduleRecordProto:
         assert(record.ttl() is None)
         assert(record.simultaneous_runs() == 0)
         assert(record.postpone_policy() == ScheduledTaskPostponePolicy.wait)
+
+
+def test_task_result() -> None:
+    result = TaskResult()
+    with pytest.raises(AttributeError):
+        result.result = 1  # type: ignore[misc]  # it is a test
+
+    assert(__empty_task_result__ == TaskResult())
+    assert(hasattr(result, '__dict__') is False)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import threading
 import time
 
@@ -13,13 +14,14 @@ from pyknic.lib.datalog.proto import DatalogProto
 from pyknic.lib.datalog.datalog import Datalog
 from pyknic.lib.signals.extra import SignalWaiter
 from pyknic.lib.tasks.scheduler.chain_source import ChainedTaskState, ChainedTaskLogEntry, ChainedTasksSource
-from pyknic.lib.tasks.scheduler.chain_source import ChainedTask
+from pyknic.lib.tasks.scheduler.chain_source import ChainedTask, ChainedTaskLogIndex
 from pyknic.lib.tasks.scheduler.record import ScheduleRecord
 from pyknic.lib.tasks.scheduler.scheduler import Scheduler
 from pyknic.lib.tasks.scheduler.plain_sources import InstantTaskSource
 from pyknic.lib.tasks.proto import TaskResult, SchedulerProto, SchedulerFeedback
 from pyknic.lib.tasks.threaded_task import ThreadedTask, ThreadRunner
 
+from fixtures.asyncio import pyknic_async_test
 from fixtures.tasks import SampleTasks
 
 
@@ -127,6 +129,10 @@ class TestChainedTaskLogEntry:
         assert(entry.event_datetime >= event_datetime)
         assert(entry.state is state)
         assert(entry.result is result)
+        assert(entry.event_datetime.tzinfo is timezone.utc)
+
+        entry = ChainedTaskLogEntry(api_id, uid, state, result, event_datetime=event_datetime)
+        assert(entry.event_datetime is event_datetime)
 
     def test_exceptions(self) -> None:
         api_id = 'super_class'
@@ -139,6 +145,46 @@ class TestChainedTaskLogEntry:
         with pytest.raises(AttributeError):
             entry.api_id = "bad_class"  # type: ignore[misc]  # it is a test =)
 
+        with pytest.raises(AttributeError):
+            entry.custom_attribute = 1  # type: ignore[attr-defined]  # it is a test =)
+
+
+class TestChainedTaskLogIndex:
+
+    def test(self) -> None:
+        datalog = Datalog()
+        started_entry = ChainedTaskLogEntry('test-task1', uuid.uuid4(), ChainedTaskState.started)
+        completed_entry = ChainedTaskLogEntry('test-task1', uuid.uuid4(), ChainedTaskState.completed, TaskResult())
+        datalog.append(started_entry)
+        datalog.append(completed_entry)
+
+        log_index = ChainedTaskLogIndex.index(datalog)
+        assert(ChainedTaskLogIndex.index(datalog) is log_index)
+        assert(ChainedTaskLogIndex.index(Datalog()) is not log_index)
+
+        assert(log_index.has('test-task1') is True)
+        assert(log_index.has('test-task2') is False)
+        assert(log_index.latest('test-task1') is completed_entry)
+        assert(log_index.completed('test-task1') is completed_entry)
+        assert(log_index.finished('test-task1') is completed_entry)
+        assert(log_index.latest('test-task2') is None)
+
+        finalized_entry = ChainedTaskLogEntry('test-task1', uuid.uuid4(), ChainedTaskState.finalized)
+        datalog.append(finalized_entry)
+        assert(log_index.latest('test-task1') is finalized_entry)
+        assert(log_index.completed('test-task1') is completed_entry)
+        assert(log_index.finished('test-task1') is finalized_entry)
+
+        datalog.truncate(1)  # the "completed" entry is removed
+        assert(log_index.latest('test-task1') is finalized_entry)
+        assert(log_index.completed('test-task1') is None)
+        assert(log_index.finished('test-task1') is finalized_entry)
+
+        datalog.truncate(0)
+        assert(log_index.has('test-task1') is False)
+        assert(log_index.latest('test-task1') is None)
+        assert(log_index.finished('test-task1') is None)
+
 
 class TestChainedTasksSource:
 
@@ -200,6 +246,122 @@ class TestChainedTasksSource:
             assert(source.started_task('test-task2') is not None)
             assert(source.started_task('test-task3') is not None)
 
+    def test_shared_dependencies(self, source_helper: SourceTestHelper) -> None:
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+
+        with ThreadRunner.task(source):
+
+            @register_api(source_helper.api_registry, 'test-task1')
+            class TestClass1(TestChainedTasksSource.Task):
+                pass
+
+            @register_api(source_helper.api_registry, 'test-task2')
+            class TestClass2(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task1'}
+
+            @register_api(source_helper.api_registry, 'test-task3')
+            class TestClass3(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task1'}
+
+            @register_api(source_helper.api_registry, 'test-task4')
+            class TestClass4(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task2', 'test-task3'}
+
+            source_helper.scheduler.subscribe(source)
+            source.execute('test-task4')
+
+            started = [x.api_id for x in source.datalog().iterate() if x.state == ChainedTaskState.started]
+            assert(len(started) == 4)
+            assert(started[0] == 'test-task1')
+            assert(set(started[1:3]) == {'test-task2', 'test-task3'})
+            assert(started[3] == 'test-task4')
+
+    def test_execute_many(self, source_helper: SourceTestHelper) -> None:
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+
+        with ThreadRunner.task(source):
+
+            @register_api(source_helper.api_registry, 'test-task1')
+            class TestClass1(TestChainedTasksSource.Task):
+                pass
+
+            @register_api(source_helper.api_registry, 'test-task2')
+            class TestClass2(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task1'}
+
+            @register_api(source_helper.api_registry, 'test-task3')
+            class TestClass3(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task1'}
+
+            source_helper.scheduler.subscribe(source)
+            source.execute_many(['test-task2', 'test-task1', 'test-task3'])
+
+            started = [x.api_id for x in source.datalog().iterate() if x.state == ChainedTaskState.started]
+            assert(started == ['test-task1', 'test-task2', 'test-task3'])
+
+            uids = [x.uid for x in source.datalog().iterate() if x.state == ChainedTaskState.started]
+            assert(len(set(uids)) == 3)
+            assert(all(x.version == 4 for x in uids))
+
+            with pytest.raises(ValueError):
+                source.execute_many(['test-task1'])
+
+    @pyknic_async_test
+    async def test_execute_async(
+        self, module_event_loop: asyncio.AbstractEventLoop, source_helper: SourceTestHelper
+    ) -> None:
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+
+        with ThreadRunner.task(source):
+
+            @register_api(source_helper.api_registry, 'test-task1')
+            class TestClass1(TestChainedTasksSource.Task):
+                pass
+
+            @register_api(source_helper.api_registry, 'test-task2')
+            class TestClass2(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task1'}
+
+            source_helper.scheduler.subscribe(source)
+            await source.execute_async('test-task2')
+            assert(source.started_task('test-task1') is not None)
+            assert(source.started_task('test-task2') is not None)
+
+            with pytest.raises(ValueError):
+                await source.execute_async('test-task1')
+
+    def test_execute_inside(self, source_helper: SourceTestHelper) -> None:
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+
+        with ThreadRunner.task(source):
+
+            @register_api(source_helper.api_registry, 'test-task1')
+            class TestClass1(TestChainedTasksSource.Task):
+                pass
+
+            source_helper.scheduler.subscribe(source)
+            queue_proxy = source._ChainedTasksSource__queue_proxy  # type: ignore[attr-defined]  # just a test
+            queue_proxy.exec(lambda: source.execute('test-task1'), blocking=True, timeout=10)
+            assert(source.started_task('test-task1') is not None)
+
     def test_skip_started_coverage(self, source_helper: SourceTestHelper) -> None:
         source = ChainedTasksSource(registry=source_helper.api_registry)
         with ThreadRunner.task(source):
@@ -333,3 +495,95 @@ class TestChainedTasksSource:
 
         datalog_list = list(datalog.iterate())
         assert(len(datalog_list) == 2)
+
+    def test_started_task_index(self, source_helper: SourceTestHelper) -> None:
+        datalog = Datalog()
+        old_entry = ChainedTaskLogEntry('test-task1', uuid.uuid4(), ChainedTaskState.started)
+        new_entry = ChainedTaskLogEntry('test-task1', uuid.uuid4(), ChainedTaskState.finalized)
+        datalog.append(old_entry)
+        datalog.append(new_entry)
+
+        source = ChainedTasksSource(datalog=datalog, registry=source_helper.api_registry)
+        assert(source.started_task('test-task1') is new_entry)
+        assert(source.started_task('test-task2') is None)
+
+        task = TestChainedTasksSource.Task(datalog, 'test-task2', uuid.uuid4())
+        task.save_result(1)
+        completed_entry = source.started_task('test-task2')
+        assert(completed_entry is not None)
+        assert(completed_entry.state == ChainedTaskState.completed)
+
+        datalog.truncate(0)
+        assert(source.started_task('test-task1') is None)  # truncated entries are not found
+
+    def test_clear_cache(self, source_helper: SourceTestHelper) -> None:
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+
+        with ThreadRunner.task(source):
+
+            @register_api(source_helper.api_registry, 'test-task1')
+            class TestClass1(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task2'}
+
+            @register_api(source_helper.api_registry, 'test-task2')
+            class TestClass2(TestChainedTasksSource.Task):
+
+                @classmethod
+                def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                    return {'test-task2'}
+
+            source_helper.scheduler.subscribe(source)
+            with pytest.raises(ValueError):
+                source.execute('test-task1')
+
+            source_helper.api_registry.unregister('test-task2')
+
+            @register_api(source_helper.api_registry, 'test-task2')
+            class TestClass2a(TestChainedTasksSource.Task):
+                pass
+
+            with pytest.raises(ValueError):
+                source.execute('test-task1')  # dependencies are cached
+
+            source.clear_cache()
+            source.execute('test-task1')
+            assert(source.started_task('test-task1') is not None)
+            assert(source.started_task('test-task2') is not None)
+
+    def test_prewarm_cache(self, source_helper: SourceTestHelper) -> None:
+        requested_ids = []
+
+        @register_api(source_helper.api_registry, 'test-task1')
+        class TestClass1(TestChainedTasksSource.Task):
+
+            @classmethod
+            def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                requested_ids.append('test-task1')
+                return {'test-task2'}
+
+        @register_api(source_helper.api_registry, 'test-task2')
+        class TestClass2(TestChainedTasksSource.Task):
+
+            @classmethod
+            def dependencies(cls) -> typing.Optional[typing.Set[str]]:
+                requested_ids.append('test-task2')
+                return None
+
+        @register_api(source_helper.api_registry, 'test-function')
+        def test_function() -> None:
+            pass  # entries that are not tasks are skipped
+
+        source = ChainedTasksSource(registry=source_helper.api_registry)
+        assert(requested_ids == [])
+
+        with ThreadRunner.task(source):
+            assert(sorted(requested_ids) == ['test-task1', 'test-task2'])
+
+            source_helper.scheduler.subscribe(source)
+            source.execute('test-task1')
+            assert(source.started_task('test-task1') is not None)
+            assert(source.started_task('test-task2') is not None)
+            assert(sorted(requested_ids) == ['test-task1', 'test-task2'])
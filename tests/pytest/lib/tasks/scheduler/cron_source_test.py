@@ -104,6 +104,15 @@ class TestCronSchedule:
                 )
             ),
 
+            (
+                "0 0 * 4 *",
+                (
+                    datetime(year=2016, month=11, day=3, hour=0, minute=0, second=0, tzinfo=timezone.utc),
+                    datetime(year=2016, month=11, day=10, hour=0, minute=0, second=0, tzinfo=timezone.utc),
+                    datetime(year=2016, month=11, day=17, hour=0, minute=0, second=0, tzinfo=timezone.utc),
+                )
+            ),
+
             (
                 "7 7 * * *",
                 (
@@ -149,6 +158,31 @@ class TestCronSchedule:
         with pytest.raises(ValueError):
             CronSchedule.from_string("* * * * * *")  # too many tokens
 
+    def test_from_string(self) -> None:
+        schedule = CronSchedule.from_string(" 1  2\t3 *  5 ")
+        assert(schedule.minute() == 1)
+        assert(schedule.hour() == 2)
+        assert(schedule.day_of_month() == 3)
+        assert(schedule.day_of_week() is None)
+        assert(schedule.month() == 5)
+
+    def test_iterate_window(self) -> None:
+        start = datetime(2024, 2, 28, 23, 0, tzinfo=timezone.utc)
+        end = datetime(2024, 3, 1, 1, 0, tzinfo=timezone.utc)
+
+        schedule = CronSchedule.from_string("0 * * * *")
+        window = list(schedule.iterate_window(start, end))
+        assert(len(window) == 26)
+        assert(window[0] == start)
+        assert(window[-1] == datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc))
+
+        schedule = CronSchedule.from_string("30 12 29 * *")
+        assert(list(schedule.iterate_window(start, end)) == [datetime(2024, 2, 29, 12, 30, tzinfo=timezone.utc)])
+        assert(list(schedule.iterate_window(end, start)) == [])
+
+        with pytest.raises(ValueError):
+            list(schedule.iterate_window(start, datetime(2024, 3, 1)))
+
 
 class TestCronScheduleRecord:
 
@@ -209,6 +243,27 @@ class TestCronScheduleRecord:
         next_datetime = cron_record.next()
         assert(next_datetime == datetime(year=2001, month=1, day=1, hour=1, minute=3, second=0, tzinfo=timezone.utc))
 
+    @pytest.mark.parametrize(
+        "cron_schedule", [
+            "* * * * *",
+            "10 * * * *",
+            "10 10 * * *",
+            "* 10 * * *",
+            "10 10 * 2 *",
+        ]
+    )
+    def test_commit(self, sample_tasks: 'SampleTasks', cron_schedule: str) -> None:
+        record = sample_tasks.PlainRecord(PlainTask(lambda: None))
+        schedule = CronSchedule.from_string(cron_schedule)
+        cron_record = CronScheduleRecord(record, schedule)
+        start_datetime = datetime(year=2000, month=12, day=31, hour=23, minute=58, second=0, tzinfo=timezone.utc)
+
+        cron_record.init(start_datetime)
+        cron_iterator = schedule.iterate(start_datetime)
+        assert(cron_record.next() == next(cron_iterator))
+        for _ in range(100):
+            assert(cron_record.commit() == next(cron_iterator))
+
     def test_schedule(self, sample_tasks: 'SampleTasks') -> None:
         record = sample_tasks.PlainRecord(PlainTask(lambda: None))
         schedule = CronSchedule.from_string("* * * * *")
@@ -285,6 +340,64 @@ class TestCronTaskSource:
 
         assert(list(source.records()) == [cron_schedule2, cron_schedule1, cron_schedule3])
 
+    def test_submit_records(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
+        record = sample_tasks.PlainRecord(PlainTask(lambda: None))
+        now = datetime.now(timezone.utc)
+
+        cron_schedule1 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 4) % 24} * * *"))
+        cron_schedule2 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 3) % 24} * * *"))
+        cron_schedule3 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 5) % 24} * * *"))
+
+        source = CronTaskSource()
+        source.callback(CronTaskSource.polling_update, signals_registry)
+
+        source.submit_records([])
+        assert(signals_registry.dump(True) == [])
+
+        source.submit_records([cron_schedule1, cron_schedule3])
+        signals = signals_registry.dump(True)
+        assert(len(signals) == 1)
+
+        source.submit_records([cron_schedule2])
+        signals = signals_registry.dump(True)
+        assert(len(signals) == 1)
+
+        assert(list(source.records())[0] is cron_schedule2)
+        assert(set(source.records()) == {cron_schedule1, cron_schedule2, cron_schedule3})
+
+        cron_schedule1 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 4) % 24} * * *"))
+        cron_schedule2 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 3) % 24} * * *"))
+        cron_schedule3 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 5) % 24} * * *"))
+
+        source = CronTaskSource()
+        source.submit_records([cron_schedule1, cron_schedule3, cron_schedule2])
+        assert(list(source.records())[0] is cron_schedule2)
+        source.discard_record(cron_schedule2)
+        assert(list(source.records())[0] is cron_schedule1)
+
+    def test_submit_records_failure(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
+        record = sample_tasks.PlainRecord(PlainTask(lambda: None))
+        now = datetime.now(timezone.utc)
+
+        cron_schedule1 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 4) % 24} * * *"))
+        cron_schedule2 = CronScheduleRecord(record, CronSchedule.from_string(f"* {(now.hour + 3) % 24} * * *"))
+
+        source = CronTaskSource()
+        source.submit_record(cron_schedule2)
+        source.callback(CronTaskSource.polling_update, signals_registry)
+
+        with pytest.raises(CronRecordInitError):
+            source.submit_records([cron_schedule1, cron_schedule2])  # the second record is submitted already
+
+        # records that were initialized before a failure are scheduled still
+        assert(list(source.records()) == [cron_schedule2, cron_schedule1])
+        assert(signals_registry.dump(True) == [])  # the closest record is the same
+
+        source.discard_record(cron_schedule2)
+        assert(source.poll() is not None)
+        source.discard_record(cron_schedule1)
+        assert(source.poll() is None)
+
     def test_discard(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
         record = sample_tasks.PlainRecord(PlainTask(lambda: None))
         now = datetime.now(timezone.utc)
@@ -322,3 +435,28 @@ class TestCronTaskSource:
 
         source.discard_record(cron_schedule3)  # no mo records left
         assert(signals_registry.dump(True) == [])
+
+    def test_same_datetime(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
+        record1 = sample_tasks.PlainRecord(PlainTask(lambda: None))
+        record2 = sample_tasks.PlainRecord(PlainTask(lambda: None))
+        record3 = sample_tasks.PlainRecord(PlainTask(lambda: None))
+
+        cron_schedule1 = CronScheduleRecord(record1, CronSchedule.from_string("* * * * *"))
+        cron_schedule2 = CronScheduleRecord(record2, CronSchedule.from_string("* * * * *"))
+        cron_schedule3 = CronScheduleRecord(record3, CronSchedule.from_string("* * * * *"))
+
+        source = CronTaskSource()
+        source.callback(CronTaskSource.task_scheduled, signals_registry)
+        source.submit_record(cron_schedule1)
+        source.submit_record(cron_schedule2)
+        source.submit_record(cron_schedule3)
+
+        source.discard_record(cron_schedule1)
+        assert(list(source.records()) == [cron_schedule2, cron_schedule3])
+
+        source.poll()
+        assert(signals_registry.dump(True) == [
+            (source, CronTaskSource.task_scheduled, record2),
+            (source, CronTaskSource.task_scheduled, record3),
+        ])
+        assert(set(source.records()) == {cron_schedule2, cron_schedule3})
@@ -109,6 +109,7 @@ class TestSchedulerPostponeQueue:
             queue.postpone(i)
 
         assert(self.flush_records(queue) == result_records)
+        assert(queue._SchedulerQueue__groups == {})  # type: ignore[attr-defined]  # private attribute
 
     def test_ttl(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
         queue = SchedulerQueue()
@@ -127,6 +128,19 @@ class TestSchedulerPostponeQueue:
         assert(self.flush_records(queue) == [record1])
         assert(signals_registry.dump(True) == [(queue, SchedulerQueue.task_expired, record2)])
 
+    def test_ttl_order(self, sample_tasks: 'SampleTasks') -> None:
+        queue = SchedulerQueue()
+        task = PlainTask(lambda: None)
+
+        record1 = sample_tasks.PlainRecord(task)
+        record2 = sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + 1000))
+        record3 = sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + 500))
+        queue.postpone(record1)
+        queue.postpone(record2)
+        queue.postpone(record3)
+
+        assert(self.flush_records(queue) == [record1, record2, record3])  # ttl does not change an order
+
     def test_ttl_next_record(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
         queue = SchedulerQueue()
         queue.callback(SchedulerQueue.task_expired, signals_registry)
@@ -216,6 +230,52 @@ class TestSchedulerPostponeQueue:
 
         assert(signals_registry.dump(True) == postponed_signals)
 
+    def test_ttl_expire_all(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
+        queue = SchedulerQueue()
+        queue.callback(SchedulerQueue.task_expired, signals_registry)
+        task = PlainTask(lambda: None)
+        time_delta = 0.2
+
+        record1 = sample_tasks.PlainRecord(task)
+        record2 = sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + time_delta))
+        queue.postpone(record1)
+        queue.postpone(record2)
+
+        time.sleep(time_delta * 2)
+        assert(queue.next_record() is record1)  # expired records are dropped even if they are not the first one
+        assert(signals_registry.dump(True) == [(queue, SchedulerQueue.task_expired, record2)])
+        assert(len(queue) == 0)
+
+    def test_ttl_heap_size(self, sample_tasks: 'SampleTasks') -> None:
+        queue = SchedulerQueue()
+        task = PlainTask(lambda: None)
+
+        for _ in range(100):
+            queue.postpone(sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + 1000)))
+            queue.next_record()
+
+        assert(len(queue._SchedulerQueue__ttl_heap) <= 2)  # type: ignore[attr-defined]  # private attribute
+
+    def test_dropped_signals_order(self, sample_tasks: 'SampleTasks') -> None:
+        queue = SchedulerQueue()
+        task = PlainTask(lambda: None)
+        queue_lengths = []
+
+        def dropped_callback(source: SignalSourceProto, signal: typing.Any, value: typing.Any) -> None:
+            queue_lengths.append(len(queue))
+
+        queue.callback(SchedulerQueue.task_dropped, dropped_callback)
+
+        for _ in range(3):
+            queue.postpone(sample_tasks.PlainRecord(task, group_id='group1'))
+        queue.postpone(sample_tasks.PlainRecord(task, group_id='group2'))
+
+        queue.postpone(
+            sample_tasks.PlainRecord(task, group_id='group1', postpone_policy=ScheduledTaskPostponePolicy.keep_last)
+        )
+        assert(queue_lengths == [1, 1, 1])  # signals are emitted when records are removed already
+        assert(len(queue) == 2)
+
     def test_filtered_next_record(self, sample_tasks: 'SampleTasks') -> None:
         queue = SchedulerQueue()
         task = PlainTask(lambda: None)
@@ -245,3 +305,25 @@ class TestSchedulerPostponeQueue:
         assert(len(queue) == 1)
         queue.next_record()
         assert(len(queue) == 0)
+
+    def test_drain(self, sample_tasks: 'SampleTasks', signals_registry: 'SignalsRegistry') -> None:
+        queue = SchedulerQueue()
+        queue.callback(SchedulerQueue.task_expired, signals_registry)
+        task = PlainTask(lambda: None)
+        assert(queue.drain() == [])
+
+        record1 = sample_tasks.PlainRecord(task, group_id='group1')
+        record2 = sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + 0.2))
+        record3 = sample_tasks.PlainRecord(task, ttl=(datetime.now(timezone.utc).timestamp() + 1000))
+        queue.postpone(record1)
+        queue.postpone(record2)
+        queue.postpone(record3)
+
+        time.sleep(0.4)
+        assert(queue.drain() == [record1, record3])
+        assert(signals_registry.dump(True) == [(queue, SchedulerQueue.task_expired, record2)])
+        assert(len(queue) == 0)
+        assert(queue.next_record() is None)
+
+        queue.postpone(record1)  # the group index is cleared also
+        assert(queue.drain() == [record1])
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import enum
 import typing
 
 from pyknic.lib.tasks.proto import ScheduleRecordProto, ScheduledTaskPostponePolicy
@@ -24,6 +25,7 @@ class TestScheduleRecord:
         assert(record.ttl() is None)
         assert(record.simultaneous_runs() == 0)
         assert(record.postpone_policy() == ScheduledTaskPostponePolicy.wait)
+        assert(hasattr(record, '__dict__') is False)
 
         task2 = sample_tasks.DummyTask()
         source2 = sample_tasks.DummySource()
@@ -42,3 +44,17 @@ class TestScheduleRecord:
         assert(record.ttl() == 10)
         assert(record.simultaneous_runs() == 2)
         assert(record.postpone_policy() == ScheduledTaskPostponePolicy.drop)
+
+        group_id = ''.join(['task', '_group'])
+        assert(ScheduleRecord(task2, source2, group_id=group_id).group_id() is record.group_id())
+
+    def test_str_subclass_group_id(self, sample_tasks: 'SampleTasks') -> None:
+
+        class Groups(str, enum.Enum):
+            group1 = 'group1'
+
+        task = sample_tasks.DummyTask()
+        source = sample_tasks.DummySource()
+        record = ScheduleRecord(task, source, group_id=Groups.group1)  # str subclasses are not interned
+        assert(record.group_id() is Groups.group1)
+        assert(record.group_id() == 'group1')
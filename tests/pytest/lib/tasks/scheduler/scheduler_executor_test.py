@@ -298,3 +298,40 @@ class TestSchedulerExecutor:
 
             executor.stop_running_tasks()
             executor.await_tasks()
+
+    def test_submit_inside(self, callbacks_registry: CallbackRegistry, sample_tasks: SampleTasks) -> None:
+        executor = SchedulerExecutor()
+        record = sample_tasks.PlainRecord(PlainTask(callbacks_registry.callback('test-callback')))
+
+        with ThreadRunner.task(executor.queue_proxy()):
+            executor.queue_proxy().exec(lambda: executor.submit(record, blocking=True), blocking=True, timeout=10)
+            executor.await_tasks()
+
+        assert(callbacks_registry.calls('test-callback') == 1)
+
+    def test_simultaneous_runs(self, callbacks_registry: CallbackRegistry, sample_tasks: SampleTasks) -> None:
+        executor = SchedulerExecutor(4)
+        tasks = [TestSchedulerExecutor.Task(callbacks_registry, f'test-callback{i}') for i in range(3)]
+
+        with ThreadRunner.task(executor.queue_proxy()):
+            for task in tasks:
+                executor.submit(
+                    sample_tasks.PlainRecord(task, group_id='test-group', simultaneous_runs=2), blocking=True
+                )
+
+            assert(executor.running_tasks() == (tasks[0], tasks[1]))
+            assert(executor.pending_tasks() == (tasks[2], ))
+
+            tasks[0].event.set()
+            for _ in range(100):
+                if tasks[2] in executor.running_tasks():
+                    break
+                time.sleep(0.05)
+            assert(executor.running_tasks() == (tasks[1], tasks[2]))
+
+            tasks[1].event.set()
+            tasks[2].event.set()
+            executor.await_tasks()
+
+        assert(executor._SchedulerExecutor__running_groups == {})  # type: ignore[attr-defined]  # private attribute
+        assert(all(callbacks_registry.calls(f'test-callback{i}') == 1 for i in range(3)))